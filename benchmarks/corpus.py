@@ -0,0 +1,135 @@
+import json
+import subprocess
+
+from pathlib import Path
+
+VERSION = "v1.0"
+NAMESPACES = {
+    "instances": "https://openminds.om-i.org/instances/",
+    "props": "https://openminds.om-i.org/props/",
+    "types": "https://openminds.om-i.org/types/",
+}
+MODULE_BRANCH = "v1"
+# Types of the synthetic model: Item instances embed trees of Parts and link other Items
+TYPE_PROPERTIES = {
+    "Item": {"name": {"type": "string"}, "description": {"type": "string"},
+             "hasPart": {"type": "array", "items": {"_embeddedTypes": [NAMESPACES["types"] + "Part"]}},
+             "related": {"_linkedTypes": [NAMESPACES["types"] + "Item"]}},
+    "Part": {"name": {"type": "string"},
+             "hasPart": {"type": "array", "items": {"_embeddedTypes": [NAMESPACES["types"] + "Part"]}}},
+}
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def _git(*args, cwd):
+    subprocess.run(["git", "-c", "user.name=benchmark", "-c", "user.email=benchmark@localhost", *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+
+def _git_repository(work_tree, bare_path, branch):
+    """
+    Commits a work tree to a new bare repository, used as a local git remote. Returns the commit.
+    """
+    _git("init", "-q", "-b", branch, cwd=work_tree)
+    _git("add", ".", cwd=work_tree)
+    _git("commit", "-q", "-m", "Synthetic corpus", cwd=work_tree)
+    _git("clone", "-q", "--bare", str(work_tree), str(bare_path), cwd=work_tree)
+    _git("config", "uploadpack.allowFilter", "true", cwd=bare_path)
+    _git("config", "uploadpack.allowAnySHA1InWant", "true", cwd=bare_path)
+    return subprocess.run(["git", "rev-parse", "HEAD"], cwd=work_tree, check=True, capture_output=True,
+                          text=True).stdout.strip()
+
+
+def _schema(type_name):
+    properties = {NAMESPACES["props"] + name: definition for name, definition in TYPE_PROPERTIES[type_name].items()}
+    return {"_type": NAMESPACES["types"] + type_name, "required": [NAMESPACES["props"] + "name"],
+            "properties": properties}
+
+
+def _part(depth, fanout):
+    return {"@type": NAMESPACES["types"] + "Part", "name": f"part at depth {depth}",
+            "hasPart": [_part(depth - 1, fanout) for _ in range(fanout)] if depth > 1 else []}
+
+
+def generate(directory, instances=100, depth=2, fanout=2, schemas=10, extends_depth=3):
+    """
+    Generates a synthetic corpus in 'directory':
+        - 'raw/': the files served as raw.githubusercontent (versions.json and the vocab).
+        - 'api/': the files served by the GitHub contents API (the base schema of the remote _extends).
+        - 'remotes/': local git remotes for the central repository and the openMINDS_core submodule.
+        - 'workspace/': 'instances' Items embedding Part trees of the given depth and fan-out and linking the next
+          Item, and 'schemas' chains of 'extends_depth' schema templates, the first extending a remote schema.
+    """
+    directory = Path(directory)
+    remotes = directory / "remotes"
+    remotes.mkdir(parents=True)
+
+    # openMINDS_core submodule, pinned in versions.json and listed by ls-remote for 'latest'
+    core_tree = directory / "core"
+    _write_json(core_tree / "schemas" / "base.schema.tpl.json",
+                {"_type": NAMESPACES["types"] + "Base", "required": ["name"], "properties": {"name": {"type": "string"}}})
+    core_commit = _git_repository(core_tree, remotes / "openMINDS_core.git", MODULE_BRANCH)
+    core_repository = (remotes / "openMINDS_core.git").as_uri()
+    _write_json(directory / "api" / "openMINDS_core" / core_commit / "schemas" / "base.schema.tpl.json",
+                json.loads((core_tree / "schemas" / "base.schema.tpl.json").read_text()))
+
+    module = {"repository": core_repository, "branch": MODULE_BRANCH, "commit": core_commit}
+    _write_json(directory / "raw" / "pipeline" / "versions.json", {
+        VERSION: {"namespaces": {"instances": NAMESPACES["instances"], "types": NAMESPACES["types"]},
+                  "modules": {"core": module}},
+    })
+
+    # Vocab
+    _write_json(directory / "raw" / "main" / "vocab" / "types.json", {
+        type_name: {"isPartOfVersion": [VERSION],
+                    "hasNamespace": [{"namespace": NAMESPACES["types"], "inVersions": [VERSION]}]}
+        for type_name in TYPE_PROPERTIES
+    })
+    used_in = {}
+    for type_name, properties in TYPE_PROPERTIES.items():
+        for property in properties:
+            used_in.setdefault(property, []).append(NAMESPACES["types"] + type_name)
+    _write_json(directory / "raw" / "main" / "vocab" / "properties.json",
+                {property: {"usedIn": {VERSION: types}} for property, types in used_in.items()})
+
+    # Central repository with the schemas of the version
+    central_tree = directory / "central"
+    for type_name in TYPE_PROPERTIES:
+        _write_json(central_tree / "schemas" / VERSION / "core" / f"{type_name[0].lower()}{type_name[1:]}.schema.omi.json",
+                    _schema(type_name))
+    _git_repository(central_tree, remotes / "openMINDS.git", "main")
+
+    # Instances
+    workspace = directory / "workspace"
+    for index in range(instances):
+        _write_json(workspace / "instances" / VERSION / "items" / f"item{index}.jsonld", {
+            "@context": {"@vocab": NAMESPACES["props"]},
+            "@id": f"{NAMESPACES['instances']}item/item{index}",
+            "@type": NAMESPACES["types"] + "Item",
+            "name": f"Item {index}",
+            "description": "Synthetic instance.",
+            "hasPart": [_part(depth, fanout) for _ in range(fanout)] if depth > 0 else [],
+            "related": {"@id": f"{NAMESPACES['instances']}item/item{(index + 1) % instances}"},
+        })
+    _git("init", "-q", cwd=workspace)
+    _git("add", ".", cwd=workspace)
+    _git("commit", "-q", "-m", "Synthetic instances", cwd=workspace)
+
+    # Schema templates
+    for chain in range(schemas):
+        for level in range(extends_depth):
+            _write_json(workspace / "schemas" / f"chain{chain}" / f"level{level}.schema.tpl.json", {
+                "_type": f"{NAMESPACES['types']}Chain{chain}Level{level}",
+                "_extends": f"chain{chain}/level{level - 1}.schema.tpl.json" if level else "/core/schemas/base.schema.tpl.json",
+                "required": [f"property{level}", "name"],
+                "properties": {f"property{level}": {"type": "string", "_instruction": "Synthetic property."}},
+            })
+
+    return {"core_repository": core_repository, "core_branch": MODULE_BRANCH,
+            "central_repository": (remotes / "openMINDS.git").as_uri(), "workspace": workspace}
@@ -0,0 +1,85 @@
+import base64
+import threading
+
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, unquote
+
+
+class FakeGitHub(object):
+    """
+    Local stand-in for raw.githubusercontent.com and the contents API of api.github.com, serving the files of a
+    directory:
+        - '<base_url>/raw/<branch>/<path>' from '<directory>/raw/<branch>/<path>'.
+        - '<base_url>/api/repos/<organization>/<repository>/contents/<path>?ref=<commit>' from
+          '<directory>/api/<repository>/<commit>/<path>'.
+    The requests are counted per kind ('raw', 'api'), see 'requests'.
+    """
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _count(self, kind):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _resolve(self, url):
+        url = urlsplit(url)
+        parts = [unquote(part) for part in url.path.split("/")[1:]]
+        if parts[0] == "raw":
+            return "raw", self.directory.joinpath(*parts)
+        if parts[0] == "api" and len(parts) > 5 and parts[1] == "repos" and parts[4] == "contents":
+            commit = parse_qs(url.query).get("ref", [""])[0]
+            return "api", self.directory.joinpath("api", parts[3], commit, *parts[5:])
+        return None, None
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, head):
+                kind, file_path = fake._resolve(self.path)
+                fake._count(kind or "unknown")
+                if file_path is None or not file_path.is_file():
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                content = file_path.read_bytes()
+                if kind == "api":
+                    content = b'{"encoding": "base64", "content": "' + base64.b64encode(content) + b'"}'
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(content)
+
+            def do_GET(self):
+                self._send(head=False)
+
+            def do_HEAD(self):
+                self._send(head=True)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
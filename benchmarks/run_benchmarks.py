@@ -0,0 +1,254 @@
+"""
+Benchmarks InstanceValidator and SchemaTemplateValidator on a synthetic corpus (see corpus.generate), with a local
+stand-in for GitHub (see FakeGitHub) and local git remotes instead of the network.
+
+Each phase reports its wall time, its peak memory (traced allocations above the memory held when it starts) and its
+network, filesystem and subprocess call counts. Phases run in order in the same process, so later phases see the
+caches warmed up by the earlier ones, as in a batch validation. Timings include the tracemalloc overhead.
+
+Usage, from the root of the repository:
+    python -m benchmarks.run_benchmarks --instances 500 --depth 3 --save-baseline
+    python -m benchmarks.run_benchmarks --instances 500 --depth 3
+The second run fails if a phase regressed compared to the baseline.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from collections import Counter
+from pathlib import Path
+
+from benchmarks.corpus import generate
+from benchmarks.fake_github import FakeGitHub
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+# Audit events counted in each phase
+AUDIT_EVENTS = {"open": "fs_open", "os.listdir": "fs_list", "os.scandir": "fs_list",
+                "socket.connect": "connections", "subprocess.Popen": "subprocesses"}
+# Differences under these thresholds are not regressions, whatever the tolerance
+MIN_TIME_DELTA = 0.05
+MIN_MEMORY_DELTA_KB = 256
+
+_calls = Counter()
+
+
+def _audit(event, args):
+    # Only the calls of the benchmarked code, not the ones of the FakeGitHub threads
+    if event in AUDIT_EVENTS and threading.current_thread() is threading.main_thread():
+        _calls[AUDIT_EVENTS[event]] += 1
+
+
+class Benchmark(object):
+    """
+    Measures phases and compares them with a baseline.
+    """
+    def __init__(self, server):
+        self.server = server
+        self.results = {}
+
+    def measure(self, name, function):
+        _calls.clear()
+        self.server.requests.clear()
+        start_memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        function()
+        wall_time = time.perf_counter() - start
+        _, peak_memory = tracemalloc.get_traced_memory()
+        self.results[name] = {
+            "wall_time": round(wall_time, 4),
+            "peak_kb": round(max(peak_memory - start_memory, 0) / 1024, 1),
+            "raw_requests": self.server.requests["raw"],
+            "api_requests": self.server.requests["api"],
+            **{counter: _calls[counter] for counter in sorted(set(AUDIT_EVENTS.values()))},
+        }
+
+    def report(self):
+        columns = ["wall_time", "peak_kb", "raw_requests", "api_requests", *sorted(set(AUDIT_EVENTS.values()))]
+        width = max(len(name) for name in self.results)
+        print(f"{'phase':<{width}}  " + "  ".join(f"{column:>12}" for column in columns))
+        for name, result in self.results.items():
+            print(f"{name:<{width}}  " + "  ".join(f"{result[column]:>12}" for column in columns))
+
+    def regressions(self, baseline, tolerance):
+        """
+        Returns the regressions compared to the baseline: slower or bigger by more than 'tolerance' (a fraction),
+        or making more calls.
+        """
+        regressions = []
+        for name, expected in baseline.items():
+            result = self.results.get(name)
+            if result is None:
+                continue
+            for metric, value in expected.items():
+                current = result.get(metric, 0)
+                if metric == "wall_time":
+                    regressed = current > value * (1 + tolerance) and current - value > MIN_TIME_DELTA
+                elif metric == "peak_kb":
+                    regressed = current > value * (1 + tolerance) and current - value > MIN_MEMORY_DELTA_KB
+                else:
+                    regressed = current > value
+                if regressed:
+                    regressions.append(f"{name}: {metric} {value} -> {current}")
+        return regressions
+
+
+class LoggedErrors(logging.Handler):
+    """
+    Collects the errors logged outside of the validator checks (e.g. by load_json), which are not in the collectors
+    of the validators.
+    """
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.messages = set()
+
+    def emit(self, record):
+        if getattr(record, "diagnostic", None) is None:
+            self.messages.add(record.getMessage())
+
+
+def run(benchmark, corpus):
+    # Imported once the environment points to the local stand-ins
+    from openMINDS_validation.instances import IdIndex
+    from openMINDS_validation.schemas import ExtendsResolver
+    from openMINDS_validation.utils import Versions, VocabManager, clone_central, index_submodules, \
+        fetch_remote_schema_extends
+    from openMINDS_validation.validation import InstanceValidator, SchemaTemplateValidator
+
+    # The diagnostics are collected, not printed
+    logged_errors = LoggedErrors()
+    logging.getLogger().handlers[:] = [logged_errors]
+    logging.getLogger().setLevel(logging.ERROR)
+    instance_paths = sorted(Path("instances").rglob("*.jsonld"))
+    schema_paths = sorted(Path("schemas").rglob("*.schema.tpl.json"))
+    state = {}
+
+    def setup_instances():
+        state["versions"] = Versions("./versions.json").versions
+        state["vocab"] = VocabManager("./types.json", "./properties.json")
+        state["vocab"].index("v1.0")
+        state["sources"] = clone_central()
+        state["id_index"] = IdIndex(".").load()
+
+    def load_instances():
+        state["instance_validators"] = [InstanceValidator(path, state["versions"], state["vocab"], state["sources"],
+                                                          id_index=state["id_index"]) for path in instance_paths]
+
+    def instance_check(check):
+        return lambda: [getattr(validator, check)() for validator in state["instance_validators"]]
+
+    def validate_instances():
+        for path in instance_paths:
+            InstanceValidator(path, state["versions"], state["vocab"], state["sources"], id_index=state["id_index"]).validate()
+
+    def setup_schemas():
+        state["submodules"] = index_submodules(state["versions"])
+        version, _ = state["submodules"][(corpus["core_repository"], corpus["core_branch"])]
+        state["resolver"] = ExtendsResolver(load_remote=lambda path: fetch_remote_schema_extends(path, state["versions"], version))
+
+    def load_schemas():
+        state["schema_validators"] = [SchemaTemplateValidator(path, corpus["core_repository"], corpus["core_branch"],
+                                                              state["versions"], resolver=state["resolver"],
+                                                              submodules=state["submodules"]) for path in schema_paths]
+
+    def schema_check(check):
+        return lambda: [getattr(validator, check)() for validator in state["schema_validators"]]
+
+    def validate_schemas():
+        for path in schema_paths:
+            SchemaTemplateValidator(path, corpus["core_repository"], corpus["core_branch"], state["versions"],
+                                    resolver=state["resolver"], submodules=state["submodules"]).validate()
+
+    benchmark.measure("instance: setup", setup_instances)
+    benchmark.measure("instance: load", load_instances)
+    for check in ["check_minimal_jsonld_structure", "check_atid_convention", "check_missmatch_id_type",
+                  "check_property_existence", "check_property_constraint", "check_linked_instances"]:
+        benchmark.measure(f"instance: {check}", instance_check(check))
+    benchmark.measure("instance: validate", validate_instances)
+    benchmark.measure("schema: setup", setup_schemas)
+    benchmark.measure("schema: load", load_schemas)
+    for check in ["check_attype", "check_extends", "check_required", "check_allowed_keys"]:
+        benchmark.measure(f"schema: {check}", schema_check(check))
+    benchmark.measure("schema: validate", validate_schemas)
+
+    return sum(validator.diagnostics.errors for validator in state["instance_validators"] + state["schema_validators"]) \
+        + len(logged_errors.messages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the validators on a synthetic corpus.")
+    parser.add_argument("--instances", type=int, default=200, help="Number of instances (default: 200).")
+    parser.add_argument("--depth", type=int, default=2, help="Depth of the embedded nodes of the instances (default: 2).")
+    parser.add_argument("--fanout", type=int, default=2, help="Number of embedded nodes per node (default: 2).")
+    parser.add_argument("--schemas", type=int, default=20, help="Number of _extends chains of schema templates (default: 20).")
+    parser.add_argument("--extends-depth", type=int, default=3, help="Length of the _extends chains (default: 3).")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help=f"Baseline file (default: {DEFAULT_BASELINE}).")
+    parser.add_argument("--save-baseline", action="store_true", help="Stores the results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Accepted slowdown or memory increase, as a fraction of the baseline (default: 0.25).")
+    parser.add_argument("--output", type=Path, help="Writes the results to the given JSON file.")
+    parser.add_argument("--keep", action="store_true", help="Keeps the generated corpus.")
+    args = parser.parse_args()
+
+    parameters = {"instances": args.instances, "depth": args.depth, "fanout": args.fanout, "schemas": args.schemas,
+                  "extends_depth": args.extends_depth}
+    baseline = None
+    if not args.save_baseline and args.baseline.exists():
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["parameters"] != parameters:
+            parser.error(f"the baseline was recorded with other corpus parameters: {baseline['parameters']}")
+    baseline_path = args.baseline.resolve()
+    output_path = args.output.resolve() if args.output else None
+
+    directory = Path(tempfile.mkdtemp(prefix="openMINDS_benchmark_"))
+    corpus = generate(directory, **parameters)
+    server = FakeGitHub(directory).start()
+    os.environ.update({
+        "OPENMINDS_RAW_BASE_URL": f"{server.base_url}/raw",
+        "OPENMINDS_API_BASE_URL": f"{server.base_url}/api",
+        "OPENMINDS_CENTRAL_REPOSITORY": corpus["central_repository"],
+        "OPENMINDS_CACHE_DIR": str(directory / "cache"),
+    })
+    os.environ.pop("OPENMINDS_OFFLINE", None)
+    os.chdir(corpus["workspace"])
+
+    benchmark = Benchmark(server)
+    sys.addaudithook(_audit)
+    tracemalloc.start()
+    try:
+        errors = run(benchmark, corpus)
+    finally:
+        tracemalloc.stop()
+        server.stop()
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    benchmark.report()
+    if errors:
+        print(f"⚠️ {errors} errors reported on the synthetic corpus.")
+    if args.keep:
+        print(f"Corpus kept in {directory}")
+    results = {"parameters": parameters, "results": benchmark.results}
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+    elif baseline is not None:
+        regressions = benchmark.regressions(baseline["results"], args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regressions compared to the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("✅ No regression compared to the baseline.")
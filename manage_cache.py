@@ -0,0 +1,39 @@
+import argparse
+import shutil
+
+from openMINDS_validation.cache import ArtifactCache, SchemaCache, LsRemoteCache, ResultCache, CACHE_DIR
+from openMINDS_validation.sources import SourceStore
+
+CACHES = {
+    "artifacts": lambda: ArtifactCache().clear(),
+    "id-index": lambda: shutil.rmtree(CACHE_DIR / "id-index", ignore_errors=True),
+    "schemas": lambda: SchemaCache().clear(),
+    "ls-remote": lambda: LsRemoteCache().clear(),
+    "results": lambda: ResultCache().clear(),
+    "sources": lambda: shutil.rmtree(SourceStore().directory, ignore_errors=True),
+    "vocab": lambda: shutil.rmtree(CACHE_DIR / "vocab", ignore_errors=True),
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"Manages the openMINDS validation caches in {CACHE_DIR}.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    clear_parser = subparsers.add_parser("clear", help="Invalidates caches (all of them by default).")
+    clear_parser.add_argument("caches", nargs="*", metavar="cache", help=f"One of {', '.join(sorted(CACHES))}.")
+
+    prune_parser = subparsers.add_parser("prune", help="Removes the validation results not used recently.")
+    prune_parser.add_argument("--max-age-days", type=float, default=30,
+                              help="Results not used for this number of days are removed (default: 30).")
+    args = parser.parse_args()
+
+    if args.command == "clear":
+        unknown_caches = set(args.caches) - set(CACHES)
+        if unknown_caches:
+            parser.error(f"unknown caches: {', '.join(sorted(unknown_caches))}")
+        for cache in args.caches or sorted(CACHES):
+            CACHES[cache]()
+            print(f"Cleared {cache} cache.")
+    elif args.command == "prune":
+        pruned = ResultCache().prune(args.max_age_days * 24 * 3600)
+        print(f"Pruned {pruned} cached results.")
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from pathlib import Path
+
+from openMINDS_validation.profiling import count
+
+# The cache can be configured through environment variables, e.g. to use a local mirror or for air-gapped runners
+RAW_BASE_URL = os.environ.get("OPENMINDS_RAW_BASE_URL", "https://raw.githubusercontent.com/openMetadataInitiative/openMINDS/refs/heads").rstrip("/")
+CACHE_DIR = Path(os.environ.get("OPENMINDS_CACHE_DIR", Path.home() / ".cache" / "openMINDS_validation"))
+CACHE_TTL = int(os.environ.get("OPENMINDS_CACHE_TTL", 3600))
+OFFLINE = os.environ.get("OPENMINDS_OFFLINE", "").lower() in ("1", "true", "yes")
+SCHEMA_CACHE_SIZE = int(os.environ.get("OPENMINDS_SCHEMA_CACHE_SIZE", 64 * 1024 * 1024))
+LS_REMOTE_TTL = int(os.environ.get("OPENMINDS_LS_REMOTE_TTL", 600))
+
+
+def write_atomic(path, data:bytes):
+    """
+    Writes data to path through a temporary file so that concurrent readers never see a partial file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ArtifactCache:
+    """
+    Content-addressed cache of downloaded artifacts (versions.json, vocab files).
+    Entries younger than 'ttl' seconds are served without network access, older ones are revalidated
+    with ETag/Last-Modified. In offline mode, only the cached artifacts are served.
+    """
+    def __init__(self, directory=None, ttl=None, offline=None):
+        self.directory = Path(directory or CACHE_DIR) / "artifacts"
+        self.ttl = CACHE_TTL if ttl is None else ttl
+        self.offline = OFFLINE if offline is None else offline
+        self._index_path = self.directory / "index.json"
+
+    def _load_index(self):
+        if not self._index_path.exists():
+            return {}
+        with open(self._index_path) as f:
+            return json.load(f)
+
+    def _update_index(self, url, entry):
+        index = self._load_index()
+        index[url] = entry
+        write_atomic(self._index_path, json.dumps(index, indent=2).encode("utf-8"))
+
+    def _blob_path(self, sha256):
+        return self.directory / "objects" / sha256[:2] / sha256
+
+    def fetch(self, url):
+        """
+        Returns the path of the cached content of url, downloading or revalidating it when needed.
+        Raises urllib.error.URLError if the artifact is neither available remotely nor cached.
+        """
+        entry = self._load_index().get(url)
+        blob_path = self._blob_path(entry["sha256"]) if entry else None
+        if blob_path is not None and not blob_path.exists():
+            entry, blob_path = None, None
+
+        if blob_path is not None and (self.offline or time.time() - entry["fetched_at"] < self.ttl):
+            count("cache.artifacts.hit")
+            return blob_path
+        if self.offline:
+            raise urllib.error.URLError(f"{url} is not cached and offline mode is enabled")
+
+        request = urllib.request.Request(url)
+        if entry and entry.get("etag"):
+            request.add_header("If-None-Match", entry["etag"])
+        if entry and entry.get("last_modified"):
+            request.add_header("If-Modified-Since", entry["last_modified"])
+
+        count("network.raw_requests")
+        try:
+            with urllib.request.urlopen(request) as response:
+                content = response.read()
+                headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and entry:
+                count("cache.artifacts.revalidated")
+                entry["fetched_at"] = time.time()
+                self._update_index(url, entry)
+                return blob_path
+            if not entry:
+                raise
+            logging.warning(f'Using cached "{url}": {e}')
+            return blob_path
+        except (urllib.error.URLError, IOError) as e:
+            if not entry:
+                raise
+            logging.warning(f'Using cached "{url}": {e}')
+            return blob_path
+
+        count("cache.artifacts.miss")
+        sha256 = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(sha256)
+        if not blob_path.exists():
+            write_atomic(blob_path, content)
+        self._update_index(url, {
+            "sha256": sha256,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        })
+        return blob_path
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class SchemaCache:
+    """
+    On-disk cache of remote schemas keyed by (repository, commit, path). Since a commit is immutable,
+    entries never expire; the least recently used ones are evicted once the cache exceeds 'max_size' bytes.
+    """
+    def __init__(self, directory=None, max_size=None):
+        self.directory = Path(directory or CACHE_DIR) / "schemas"
+        self.max_size = SCHEMA_CACHE_SIZE if max_size is None else max_size
+
+    def _path(self, repository, commit, path):
+        key = hashlib.sha256(f"{repository}\0{commit}\0{path}".encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json"
+
+    def get(self, repository, commit, path):
+        cached_path = self._path(repository, commit, path)
+        try:
+            with open(cached_path) as f:
+                schema = json.load(f)
+        except FileNotFoundError:
+            count("cache.schemas.miss")
+            return None
+        count("cache.schemas.hit")
+        # Access time is tracked through the modification time, atime being often disabled
+        os.utime(cached_path)
+        return schema
+
+    def put(self, repository, commit, path, schema):
+        write_atomic(self._path(repository, commit, path), json.dumps(schema).encode("utf-8"))
+        self._evict()
+
+    def _evict(self):
+        entries = [(entry.stat(), entry) for entry in self.directory.glob("*.json")]
+        total_size = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in sorted(entries, key=lambda x: x[0].st_mtime):
+            if total_size <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            total_size -= stat.st_size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class LsRemoteCache:
+    """
+    Memoizes the branches of remote repositories on disk for 'ttl' seconds.
+    """
+    def __init__(self, directory=None, ttl=None):
+        self.path = Path(directory or CACHE_DIR) / "ls-remote.json"
+        self.ttl = LS_REMOTE_TTL if ttl is None else ttl
+
+    def _load(self):
+        if not self.path.exists():
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def heads(self, repository, ls_remote):
+        """
+        Returns the output of 'ls_remote(repository)', from the cache if it is recent enough (or in offline mode).
+        """
+        entries = self._load()
+        entry = entries.get(repository)
+        if entry and (OFFLINE or time.time() - entry["fetched_at"] < self.ttl):
+            count("cache.ls_remote.hit")
+            return entry["heads"]
+        count("cache.ls_remote.miss")
+        heads = ls_remote(repository)
+        entries[repository] = {"heads": heads, "fetched_at": time.time()}
+        write_atomic(self.path, json.dumps(entries, indent=2).encode("utf-8"))
+        return heads
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+class ResultCache:
+    """
+    On-disk cache of validation results keyed by the hash of a file together with the hashes of its inputs.
+    """
+    def __init__(self, directory=None):
+        self.directory = Path(directory or CACHE_DIR) / "results"
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """
+        Returns the cached result ({"messages": [...], "diagnostics": [...]}) for key, None if not cached.
+        """
+        cached_path = self._path(key)
+        try:
+            with open(cached_path) as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            count("cache.results.miss")
+            return None
+        count("cache.results.hit")
+        os.utime(cached_path)
+        return result
+
+    def put(self, key, messages, diagnostics):
+        result = {"messages": messages, "diagnostics": [diagnostic._asdict() for diagnostic in diagnostics]}
+        write_atomic(self._path(key), json.dumps(result).encode("utf-8"))
+
+    def prune(self, max_age):
+        """
+        Removes the results that have not been used for 'max_age' seconds and returns their number.
+        """
+        pruned = 0
+        threshold = time.time() - max_age
+        for entry in self.directory.glob("*/*.json"):
+            if entry.stat().st_mtime < threshold:
+                entry.unlink(missing_ok=True)
+                pruned += 1
+        return pruned
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def hash_digest(*parts):
+    """
+    Returns the SHA-256 of the given parts (bytes or strings).
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+_code_digest = None
+
+def code_digest():
+    """
+    Returns a hash of the validation code, so that cached results are invalidated when the checks change.
+    """
+    global _code_digest
+    if _code_digest is None:
+        _code_digest = hash_digest(*(path.read_bytes() for path in sorted(Path(__file__).parent.glob("*.py"))))
+    return _code_digest
+
+
+def artifact_url(branch, path):
+    """
+    Returns the URL of a file of the central openMINDS repository, relative to the configured base URL.
+    """
+    return f"{RAW_BASE_URL}/{branch}/{path}"
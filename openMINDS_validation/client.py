@@ -0,0 +1,77 @@
+import http.client
+import json
+import os
+import socket
+
+# Only depends on the standard library, so that clients start fast
+DEFAULT_ADDRESS = os.environ.get("OPENMINDS_SERVER_ADDRESS", "127.0.0.1:8740")
+
+
+def parse_address(address):
+    """
+    Returns ('tcp', (host, port)) for 'HOST:PORT' and ('unix', path) for a Unix socket path.
+    """
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit() and "/" not in address:
+        return "tcp", (host, int(port))
+    return "unix", address
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+class ValidationClient(object):
+    """
+    Client of the validation server (see openMINDS_validation.server).
+    """
+    def __init__(self, address=None, timeout=60):
+        self.kind, self.address = parse_address(address or DEFAULT_ADDRESS)
+        self.timeout = timeout
+
+    def _connection(self):
+        if self.kind == "unix":
+            return UnixHTTPConnection(self.address, timeout=self.timeout)
+        return http.client.HTTPConnection(*self.address, timeout=self.timeout)
+
+    def request(self, method, path, body=None):
+        """
+        Sends a request and returns the decoded JSON response, raising ConnectionError on server errors.
+        """
+        connection = self._connection()
+        try:
+            data = json.dumps(body).encode("utf-8") if body is not None else None
+            connection.request(method, path, body=data, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            content = json.loads(response.read() or b"{}")
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise ConnectionError(content.get("error", f"Unexpected status {response.status}"))
+        return content
+
+    def validate_path(self, path, repository=None, branch=None):
+        """
+        Validates an instance or schema template file (schema templates require the repository and branch of their
+        submodule). Relative paths are resolved against the current directory.
+        """
+        return self.request("POST", "/validate", {"path": os.path.abspath(path), "repository": repository, "branch": branch})
+
+    def validate_instance(self, instance, version, label="<inline>"):
+        return self.request("POST", "/validate", {"instance": instance, "version": version, "label": label})
+
+    def status(self):
+        return self.request("GET", "/status")
+
+    def reload(self):
+        return self.request("POST", "/reload")
+
+    def shutdown(self):
+        return self.request("POST", "/shutdown")
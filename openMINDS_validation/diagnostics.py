@@ -0,0 +1,96 @@
+import json
+import logging
+
+from collections import namedtuple
+
+ERROR = "error"
+WARNING = "warning"
+
+# 'version' is only set by matrix validations (see openMINDS_validation.matrix): the version the file was checked against
+Diagnostic = namedtuple("Diagnostic", ["file", "pointer", "check", "severity", "message", "version"], defaults=(None,))
+
+
+def json_pointer(*tokens):
+    """
+    Builds a JSON pointer (RFC 6901) from the given reference tokens.
+    """
+    return "".join("/" + str(token).replace("~", "~0").replace("/", "~1") for token in tokens)
+
+
+class DiagnosticCollector(object):
+    """
+    Collects the diagnostics emitted by the validators and exports them as JSON lines or SARIF.
+    """
+    def __init__(self):
+        self.diagnostics = []
+
+    def add(self, diagnostic):
+        self.diagnostics.append(diagnostic)
+
+    def extend(self, diagnostics):
+        self.diagnostics.extend(diagnostics)
+
+    @property
+    def errors(self):
+        return sum(1 for diagnostic in self.diagnostics if diagnostic.severity == ERROR)
+
+    @property
+    def warnings(self):
+        return sum(1 for diagnostic in self.diagnostics if diagnostic.severity == WARNING)
+
+    def exit_status(self):
+        return 1 if self.errors else 0
+
+    def write_jsonl(self, stream):
+        for diagnostic in self.diagnostics:
+            stream.write(json.dumps(diagnostic._asdict()) + "\n")
+
+    def write_sarif(self, stream):
+        checks = sorted({diagnostic.check for diagnostic in self.diagnostics})
+        results = [{
+            "ruleId": diagnostic.check,
+            "level": diagnostic.severity,
+            "message": {"text": diagnostic.message},
+            "locations": [{
+                "physicalLocation": {"artifactLocation": {"uri": diagnostic.file}},
+                "logicalLocations": [{"fullyQualifiedName": diagnostic.pointer or "/"}],
+            }],
+            **({"properties": {"version": diagnostic.version}} if diagnostic.version is not None else {}),
+        } for diagnostic in self.diagnostics]
+        sarif = {
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+            "version": "2.1.0",
+            "runs": [{
+                "tool": {"driver": {"name": "openMINDS_validation", "rules": [{"id": check} for check in checks]}},
+                "results": results,
+            }],
+        }
+        json.dump(sarif, stream, indent=2)
+        stream.write("\n")
+
+    def write(self, path, report_format):
+        with open(path, "w") as f:
+            if report_format == "sarif":
+                self.write_sarif(f)
+            else:
+                self.write_jsonl(f)
+
+
+class DiagnosticReporter(object):
+    """
+    Mixin for the validators: reports diagnostics to a collector and logs them.
+    """
+    # Version recorded in the diagnostics of matrix validations
+    matrix_version = None
+
+    def _report(self, severity, check, message, pointer=""):
+        diagnostic = Diagnostic(str(self.absolute_path), pointer, check, severity, message, self.matrix_version)
+        self.diagnostics.add(diagnostic)
+        level = logging.ERROR if severity == ERROR else logging.WARNING
+        logging.log(level, message, stacklevel=3, extra={"diagnostic": diagnostic})
+
+    def _error(self, check, message, pointer=""):
+        self._report(ERROR, check, message, pointer)
+
+    def _warning(self, check, message, pointer=""):
+        self._report(WARNING, check, message, pointer)
@@ -0,0 +1,137 @@
+import base64
+import http.client
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, quote
+
+from openMINDS_validation.profiling import count
+
+# Can point to a GitHub Enterprise instance or to a local stand-in server
+API_BASE_URL = os.environ.get("OPENMINDS_API_BASE_URL", "https://api.github.com").rstrip("/")
+MAX_CONNECTIONS = int(os.environ.get("OPENMINDS_MAX_CONNECTIONS", 8))
+MAX_RATE_LIMIT_WAIT = int(os.environ.get("OPENMINDS_MAX_RATE_LIMIT_WAIT", 60))
+ORGANIZATION = "openMetadataInitiative"
+
+
+class GitHubFetcher(object):
+    """
+    Client for the GitHub contents API reusing keep-alive connections from a pool. At most 'max_connections'
+    requests run at the same time. When the rate limit is exhausted, requests wait for its reset (up to
+    MAX_RATE_LIMIT_WAIT seconds).
+    """
+    def __init__(self, base_url=None, max_connections=None, token=None):
+        url = urlsplit(base_url or API_BASE_URL)
+        self._scheme = url.scheme
+        self._netloc = url.netloc
+        self._prefix = url.path.rstrip("/")
+        self.max_connections = max_connections or MAX_CONNECTIONS
+        self._headers = {"Accept": "application/vnd.github+json", "User-Agent": "openMINDS_validation"}
+        token = token or os.environ.get("GITHUB_TOKEN")
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+        self._idle_connections = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._rate_limit_reset = 0
+
+    def _connection(self):
+        try:
+            return self._idle_connections.get_nowait()
+        except queue.Empty:
+            connection_class = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            return connection_class(self._netloc, timeout=30)
+
+    def _wait_rate_limit(self):
+        wait = self._rate_limit_reset - time.time()
+        if wait > 0:
+            logging.warning(f"GitHub rate limit exhausted, waiting {min(wait, MAX_RATE_LIMIT_WAIT):.0f}s.")
+            time.sleep(min(wait, MAX_RATE_LIMIT_WAIT))
+
+    def _update_rate_limit(self, status, headers):
+        if headers.get("Retry-After"):
+            self._rate_limit_reset = time.time() + int(headers["Retry-After"])
+        elif headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+            self._rate_limit_reset = int(headers["X-RateLimit-Reset"])
+        return status in (403, 429) and self._rate_limit_reset > time.time()
+
+    def request(self, method, path):
+        """
+        Sends a request and returns (status, headers, body). Retries once on a stale connection or a rate limit.
+        """
+        with self._slots:
+            for attempt in range(2):
+                self._wait_rate_limit()
+                count("network.github_api_requests")
+                connection = self._connection()
+                try:
+                    connection.request(method, self._prefix + path, headers=self._headers)
+                    response = connection.getresponse()
+                    body = response.read()
+                except (http.client.HTTPException, ConnectionError):
+                    # Keep-alive connection closed by the server
+                    connection.close()
+                    if attempt:
+                        raise
+                    continue
+                if response.will_close:
+                    connection.close()
+                else:
+                    self._idle_connections.put(connection)
+                if self._update_rate_limit(response.status, response.headers) and not attempt:
+                    continue
+                return response.status, response.headers, body
+
+    @staticmethod
+    def contents_path(repository, path, commit):
+        return f"/repos/{ORGANIZATION}/{quote(repository)}/contents/{quote(path)}?ref={quote(commit)}"
+
+    def exists(self, repository, path, commit):
+        """
+        Checks that a file exists with a HEAD request (no content transferred). Raises on statuses other than 200 and
+        404 (e.g. rate limit), for the validation to be aborted rather than the file reported missing.
+        """
+        status, _, _ = self.request("HEAD", self.contents_path(repository, path, commit))
+        if status not in (200, 404):
+            raise http.client.HTTPException(f"Unexpected status {status} for {repository}/{path}@{commit}")
+        return status == 200
+
+    def fetch_json(self, repository, path, commit):
+        """
+        Returns the parsed content of a JSON file, None if it does not exist.
+        """
+        status, _, body = self.request("GET", self.contents_path(repository, path, commit))
+        if status == 404:
+            return None
+        if status != 200:
+            raise http.client.HTTPException(f"Unexpected status {status} for {repository}/{path}@{commit}")
+        return json.loads(base64.b64decode(json.loads(body)["content"]).decode("utf-8"))
+
+    def map(self, function, items):
+        """
+        Runs function on all items over up to 'max_connections' threads and returns the results in order.
+        """
+        items = list(items)
+        if len(items) <= 1:
+            return [function(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_connections, len(items))) as executor:
+            return list(executor.map(function, items))
+
+    def close(self):
+        while not self._idle_connections.empty():
+            self._idle_connections.get_nowait().close()
+
+
+_fetchers = {}
+
+def get_fetcher():
+    """
+    Returns the GitHubFetcher shared by the threads of the process (connections are not shared with forked workers).
+    """
+    if os.getpid() not in _fetchers:
+        _fetchers[os.getpid()] = GitHubFetcher()
+    return _fetchers[os.getpid()]
@@ -0,0 +1,223 @@
+import json
+import logging
+import pickle
+
+from collections import deque
+from pathlib import Path, PurePath
+from git import Repo, GitCommandError, InvalidGitRepositoryError
+
+from openMINDS_validation.cache import CACHE_DIR, hash_digest, write_atomic
+from openMINDS_validation.instances import changed_files_since
+from openMINDS_validation.profiling import profiled
+from openMINDS_validation.sources import SourceStore
+from openMINDS_validation.utils import get_sources_commit, vocab_index_path
+
+
+class DependencyState(object):
+    """
+    Dependencies the instances of a repository were last validated against: the schema sources commit, the vocab
+    digest and the versions.json entry of each version, with the instances that failed the validation. Stored in the
+    cache, per repository.
+    """
+    def __init__(self, root=".", directory=None):
+        self.path = Path(directory or CACHE_DIR) / "impact" / f"{hash_digest(Path(root).resolve())[:16]}.json"
+
+    def load(self):
+        """
+        Returns the stored dependencies, None if the repository was never validated with this cache.
+        """
+        if not self.path.exists():
+            return None
+        with open(self.path) as f:
+            return json.load(f)
+
+    def save(self, sources_commit, vocab_digest, versions, failed=()):
+        write_atomic(self.path, json.dumps({
+            "sources_commit": sources_commit,
+            "vocab_digest": vocab_digest,
+            "versions": {version: versions_digest(versions, version) for version in versions},
+            "failed": sorted(failed),
+        }).encode("utf-8"))
+
+
+def versions_digest(versions, version):
+    return hash_digest(json.dumps(versions.get(version), sort_keys=True))
+
+
+def _changed_files(base, pathspec, cwd="."):
+    """
+    Returns the files matching pathspec changed since the base commit (see instances.changed_files_since), None if the
+    base commit is not available.
+    """
+    try:
+        return changed_files_since(Repo(cwd, search_parent_directories=True), base, pathspec)
+    except (GitCommandError, InvalidGitRepositoryError) as e:
+        logging.warning(f'Unable to compare with "{base}": {e}')
+        return None
+
+
+def _instance_at(base, file_path, cwd="."):
+    """
+    Returns the instance of a file at the base commit, None if it did not exist or was not valid JSON.
+    """
+    try:
+        return json.loads(Repo(cwd, search_parent_directories=True).git.show(f"{base}:{file_path}"))
+    except (GitCommandError, InvalidGitRepositoryError, ValueError):
+        return None
+
+
+def schema_types(changed_files):
+    """
+    Maps the changed files of the central repository ('schemas/<version>/.../<name>.schema.omi.json') to the names of
+    the changed types, per version.
+    """
+    types = {}
+    for file_path in changed_files:
+        parts = PurePath(file_path).parts
+        if len(parts) > 2 and parts[-1].endswith(".schema.omi.json"):
+            name = parts[-1][:-len(".schema.omi.json")]
+            types.setdefault(parts[1], set()).add(name[:1].upper() + name[1:])
+    return types
+
+
+def vocab_types(old_digest, vocab, version):
+    """
+    Returns the names of the types whose vocab entries (namespace, properties) differ between the vocab of the given
+    digest and the current one, None if the previous vocab index is not cached anymore.
+    """
+    old_index_path = vocab_index_path(old_digest, version)
+    if not old_index_path.exists():
+        return None
+    with open(old_index_path, "rb") as f:
+        old_index = pickle.load(f)
+    new_index = vocab.index(version)
+    types = {name for name in old_index.types.keys() | new_index.types.keys()
+             if old_index.types.get(name) != new_index.types.get(name)}
+    types.update(type_iri.split('/')[-1] for type_iri in old_index.type_properties.keys() | new_index.type_properties.keys()
+                 if old_index.type_properties.get(type_iri) != new_index.type_properties.get(type_iri))
+    return types
+
+
+def _affected_by_dependencies(index, state, previous):
+    """
+    Returns the instances affected by the changes of the versions.json entries, schema sources and vocab since the
+    previous validation, mapped to the reason they are affected.
+    """
+    affected = {}
+    versions = sorted({entry["version"] for entry in index.files.values()})
+    for version in versions:
+        if previous["versions"].get(version) != versions_digest(state["versions"], version):
+            affected.update((file_path, f"versions.json changed for {version}") for file_path, entry in index.files.items()
+                            if entry["version"] == version and file_path not in affected)
+
+    sources_commit = get_sources_commit(state["sources"])
+    if previous["sources_commit"] != sources_commit:
+        try:
+            changed_types = schema_types(SourceStore().changed_files(previous["sources_commit"], sources_commit))
+        except GitCommandError as e:
+            logging.warning(f'Unable to compare the schema sources with "{previous["sources_commit"]}": {e}')
+            changed_types = None
+        for version in versions:
+            if changed_types is None:
+                file_paths = [file_path for file_path, entry in index.files.items() if entry["version"] == version]
+            else:
+                file_paths = index.files_using(version, changed_types.get(version, ()))
+            for file_path in file_paths:
+                affected.setdefault(file_path, "schema changed")
+
+    if previous["vocab_digest"] != state["vocab"].digest:
+        for version in versions:
+            changed_types = vocab_types(previous["vocab_digest"], state["vocab"], version)
+            if changed_types is None:
+                file_paths = [file_path for file_path, entry in index.files.items() if entry["version"] == version]
+            else:
+                file_paths = index.files_using(version, changed_types)
+            for file_path in file_paths:
+                affected.setdefault(file_path, "vocab changed")
+    return affected
+
+
+@profiled
+def affected_instances(index, base, state, previous, check_links:bool=False):
+    """
+    Returns the instances to validate, mapped to the reason they are affected:
+        - instances changed since the base commit.
+        - instances that failed the previous validation.
+        - instances of the versions whose versions.json entry changed since the previous validation.
+        - instances using (also as embedded types) the types whose schema or vocab entries changed since the previous
+          validation, found through the type index of 'index' (an IdIndex).
+        - with check_links, instances linking to the changed instances (their @id before and after the change).
+    Without previous validation ('previous' is None, e.g. cold cache), only the changed instances and the instances
+    linking to them are affected. All the instances are affected if the base commit is not available.
+    """
+    changed = _changed_files(base, "*.jsonld", index.root)
+    if changed is None:
+        # Files the index skipped (e.g. not valid JSON) are validated as well
+        file_paths = set(index.files) | {file_path.relative_to(index.root).as_posix()
+                                         for file_path in index.root.glob("instances/**/*.jsonld")}
+        return {file_path: f'"{base}" not available' for file_path in sorted(file_paths)}
+
+    affected = {}
+    if previous is not None:
+        # Failed instances are selected until they pass
+        affected.update((file_path, "failed previously") for file_path in previous.get("failed", [])
+                        if (index.root / file_path).exists())
+        for file_path, reason in _affected_by_dependencies(index, state, previous).items():
+            affected.setdefault(file_path, reason)
+
+    for file_path in sorted(changed):
+        entry = index.files.get(file_path)
+        # Changed files are validated even if the index skipped them (e.g. not valid JSON)
+        if file_path.startswith("instances/") and (index.root / file_path).exists():
+            affected[file_path] = "changed"
+        if not check_links:
+            continue
+        # Links to the previous @id may now be dangling, links to the new one may now resolve
+        instance_ids = set()
+        old_instance = _instance_at(base, file_path, index.root)
+        if isinstance(old_instance, dict) and isinstance(old_instance.get('@id'), str):
+            instance_ids.add(old_instance['@id'])
+        if entry is not None and entry["id"] is not None:
+            instance_ids.add(entry["id"])
+        version = entry["version"] if entry is not None else index._version(file_path)
+        for linking_path in index.files_linking(version, instance_ids):
+            affected.setdefault(linking_path, f"links to {file_path}")
+
+    return dict(sorted(affected.items()))
+
+
+@profiled
+def affected_schemas(resolver, base, cwd="."):
+    """
+    Returns the schema templates to validate, mapped to the reason they are affected: the templates changed since the
+    base commit and all their _extends descendants in the repository (found through the _extends graph of 'resolver',
+    an ExtendsResolver). All the templates are affected if the base commit is not available.
+    """
+    graph = resolver.graph()
+    prefix = resolver.directory.as_posix().removeprefix("./").rstrip("/") + "/"
+    changed = _changed_files(base, f"{prefix}*.schema.tpl.json", cwd)
+    if changed is None:
+        return {prefix + extends_path: f'"{base}" not available' for extends_path in graph}
+
+    children = {}
+    for extends_path, parent in graph.items():
+        if parent is not None:
+            children.setdefault(parent, []).append(extends_path)
+
+    affected = {}
+    queue = deque()
+    # Schemas that can't be loaded are validated whether they changed or not, to report them
+    for file_path in sorted(changed | {prefix + extends_path for extends_path in resolver.unloadable}):
+        extends_path = file_path.removeprefix(prefix)
+        if extends_path in graph:
+            affected[extends_path] = "changed"
+        queue.append(extends_path)
+    seen = set(queue)
+    while queue:
+        extends_path = queue.popleft()
+        for child in children.get(extends_path, ()):
+            affected.setdefault(child, f"extends {extends_path}")
+            if child not in seen:
+                seen.add(child)
+                queue.append(child)
+    return {prefix + extends_path: reason for extends_path, reason in sorted(affected.items())}
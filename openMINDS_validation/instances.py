@@ -0,0 +1,161 @@
+import json
+import logging
+
+from pathlib import Path, PurePath
+from git import Repo, GitCommandError, InvalidGitRepositoryError
+
+from openMINDS_validation.cache import CACHE_DIR, hash_digest, write_atomic
+from openMINDS_validation.profiling import count, profiled
+
+
+def changed_files_since(repo, commit, pathspec):
+    """
+    Returns the files matching pathspec changed since the given commit (deleted ones included), with the uncommitted
+    and untracked ones. Raises GitCommandError if the commit is not available (e.g. first commit or shallow clone).
+    """
+    changed = set(repo.git.diff("--name-only", "--no-renames", commit, "--", pathspec).splitlines())
+    changed.update(repo.git.ls_files("--others", "--exclude-standard", "--", pathspec).splitlines())
+    return changed
+
+
+def _types_and_links(instance):
+    """
+    Returns the names of the types used in an instance (embedded nodes included) and the @ids it links to.
+    """
+    types, links = set(), set()
+    stack = [(instance, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if isinstance(node, list):
+            stack.extend((item, depth) for item in node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        if isinstance(node.get('@type'), str):
+            types.add(node['@type'].split('/')[-1])
+        elif depth and isinstance(node.get('@id'), str):
+            links.add(node['@id'])
+        stack.extend((value, depth + 1) for property, value in node.items() if not property.startswith('@'))
+    return sorted(types), sorted(links)
+
+
+class IdIndex(object):
+    """
+    Index of the instances of an instance repository: version -> @id -> (file, @type), and the types used and
+    @ids linked by each file.
+    The index is built once by scanning the instance tree and stored in the cache together with the commit it was
+    built at. It is then updated from the git diff since that commit, re-reading only the changed files.
+    """
+    def __init__(self, root=".", directory=None):
+        self.root = Path(root).resolve()
+        self.path = Path(directory or CACHE_DIR) / "id-index" / f"{hash_digest(self.root)[:16]}.json"
+        self.commit = None
+        self.ids = {}
+        # file -> {"version", "id", "type", "types", "links"}
+        self.files = {}
+        # Files differing from the indexed commit when the index was saved, re-read on the next update
+        self._dirty = set()
+
+    def _version(self, file_path):
+        parts = PurePath(file_path).parts
+        return parts[1] if len(parts) > 2 else None
+
+    def _index_ids(self, file_path, entry):
+        if entry["id"] is not None:
+            self.ids.setdefault(entry["version"], {})[entry["id"]] = (file_path, entry["type"])
+
+    def _remove(self, file_path):
+        entry = self.files.pop(file_path, None)
+        if entry is not None and entry["id"] is not None:
+            if self.ids.get(entry["version"], {}).get(entry["id"], (None,))[0] == file_path:
+                del self.ids[entry["version"]][entry["id"]]
+
+    def _add(self, file_path):
+        version = self._version(file_path)
+        if version is None:
+            return
+        try:
+            with open(self.root / file_path) as f:
+                instance = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f'Instance "{file_path}" not indexed: {e}')
+            return
+        if not isinstance(instance, dict):
+            return
+        types, links = _types_and_links(instance)
+        entry = {"version": version, "id": instance.get('@id'), "type": instance.get('@type'), "types": types, "links": links}
+        self.files[file_path] = entry
+        self._index_ids(file_path, entry)
+
+    def build(self):
+        count("fs.scans")
+        self.ids = {}
+        self.files = {}
+        for file_path in sorted(self.root.glob("instances/**/*.jsonld")):
+            self._add(file_path.relative_to(self.root).as_posix())
+
+    @profiled
+    def load(self):
+        """
+        Loads the stored index and brings it up to date with the working tree, or builds it from scratch.
+        """
+        try:
+            repo = Repo(self.root)
+            head = repo.head.commit.hexsha
+        except (InvalidGitRepositoryError, ValueError):
+            # Not a git repository (or no commit yet): nothing to update from
+            self.build()
+            return self
+
+        stored = None
+        if self.path.exists():
+            with open(self.path) as f:
+                stored = json.load(f)
+        # Indexes stored by previous versions (without "files") are rebuilt
+        if stored is None or "files" not in stored:
+            self.build()
+        else:
+            self.files = stored["files"]
+            self.ids = {}
+            for file_path, entry in self.files.items():
+                self._index_ids(file_path, entry)
+            try:
+                changed = changed_files_since(repo, stored["commit"], "*.jsonld") | set(stored["dirty"])
+            except GitCommandError:
+                # The stored commit is not available anymore (e.g. shallow clone)
+                self.build()
+            else:
+                for file_path in sorted(changed):
+                    self._remove(file_path)
+                    if (self.root / file_path).exists():
+                        self._add(file_path)
+
+        self.commit = head
+        self._dirty = changed_files_since(repo, head, "*.jsonld")
+        self.save()
+        return self
+
+    def save(self):
+        write_atomic(self.path, json.dumps({"commit": self.commit, "dirty": sorted(self._dirty), "files": self.files}).encode("utf-8"))
+
+    def get(self, version, instance_id):
+        """
+        Returns the (file, @type) of the instance with the given @id in the given version, None if not found.
+        """
+        return self.ids.get(version, {}).get(instance_id)
+
+    def files_using(self, version, type_names):
+        """
+        Returns the files of the given version using any of the given types (by name), embedded types included.
+        """
+        type_names = set(type_names)
+        return sorted(file_path for file_path, entry in self.files.items()
+                      if entry["version"] == version and type_names.intersection(entry["types"]))
+
+    def files_linking(self, version, instance_ids):
+        """
+        Returns the files of the given version linking to any of the given @ids.
+        """
+        instance_ids = set(instance_ids)
+        return sorted(file_path for file_path, entry in self.files.items()
+                      if entry["version"] == version and instance_ids.intersection(entry["links"]))
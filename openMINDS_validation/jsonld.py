@@ -0,0 +1,172 @@
+import json
+
+from openMINDS_validation.cache import ArtifactCache
+from openMINDS_validation.profiling import count
+
+# Active contexts, keyed by the contexts they are built from, and remote contexts, keyed by URL
+_contexts = {}
+_remote_contexts = {}
+
+
+def load_remote_context(url):
+    """
+    Returns the @context of the JSON-LD document at url, downloaded once through the artifact cache.
+    """
+    if url not in _remote_contexts:
+        with open(ArtifactCache().fetch(url)) as f:
+            _remote_contexts[url] = json.load(f).get('@context', {})
+    else:
+        count("cache.contexts.hit")
+    return _remote_contexts[url]
+
+
+class Context(object):
+    """
+    Active JSON-LD context: term definitions (term or prefix -> IRI) and @vocab. The expansion and compaction of each
+    property is memoized, and the contexts are shared (see Context.get), so that a property is resolved once for all
+    the nodes and instances using the same @context.
+    """
+    def __init__(self, terms=None, vocab=None, key=""):
+        self.terms = terms or {}
+        self.vocab = vocab
+        self.key = key
+        self._expanded = {}
+        self._compacted = {}
+        self._term_of_iri = None
+
+    @staticmethod
+    def get(local_context, parent=None, load_remote=load_remote_context):
+        """
+        Returns the active context resulting from applying a @context value (dictionary, remote URL, list of them or
+        None) to the parent context (the empty context by default).
+        """
+        parent = parent if parent is not None else _EMPTY_CONTEXT
+        if not local_context and local_context is not None:
+            return parent
+        key = (parent.key, json.dumps(local_context, sort_keys=True))
+        if key not in _contexts:
+            _contexts[key] = parent._apply(local_context, load_remote, key)
+        return _contexts[key]
+
+    def _apply(self, local_context, load_remote, key):
+        terms, vocab = dict(self.terms), self.vocab
+        local_contexts = local_context if isinstance(local_context, list) else [local_context]
+        # Remote contexts may reference other remote contexts
+        pending = list(reversed(local_contexts))
+        while pending:
+            context = pending.pop()
+            if context is None:
+                terms, vocab = {}, None
+            elif isinstance(context, str):
+                remote = load_remote(context)
+                pending.extend(reversed(remote if isinstance(remote, list) else [remote]))
+            elif isinstance(context, dict):
+                for term, definition in context.items():
+                    if term == '@vocab':
+                        vocab = definition
+                    elif term.startswith('@'):
+                        continue
+                    elif definition is None:
+                        terms.pop(term, None)
+                    else:
+                        iri = definition.get('@id') if isinstance(definition, dict) else definition
+                        if isinstance(iri, str):
+                            terms[term] = iri
+        active = Context(terms, vocab, key)
+        # Term definitions may use compact IRIs or be relative to @vocab
+        active.terms = {term: active._expand_iri(iri, term) for term, iri in terms.items()}
+        return active
+
+    def _expand_iri(self, value, term=None):
+        if value != term and value in self.terms:
+            return self.terms[value]
+        prefix, separator, suffix = value.partition(':')
+        if separator:
+            if suffix.startswith('//') or prefix not in self.terms or prefix == term:
+                # Absolute IRI
+                return value
+            return self.terms[prefix] + suffix
+        return self.vocab + value if self.vocab else value
+
+    def expand(self, property):
+        """
+        Returns the IRI of a property: term, compact IRI (prefix:suffix), absolute IRI or relative to @vocab.
+        Properties that can't be expanded are returned as is.
+        """
+        if property not in self._expanded:
+            self._expanded[property] = property if property.startswith('@') else self._expand_iri(property)
+        return self._expanded[property]
+
+    def compact(self, iri):
+        """
+        Returns the shortest form of an IRI for this context: term, relative to @vocab or compact IRI.
+        """
+        if iri not in self._compacted:
+            if self._term_of_iri is None:
+                # Shortest term first when several terms have the same IRI
+                self._term_of_iri = {term_iri: term for term, term_iri in sorted(self.terms.items(), key=lambda item: -len(item[0]))}
+            compacted = iri
+            if iri in self._term_of_iri:
+                compacted = self._term_of_iri[iri]
+            elif self.vocab and iri.startswith(self.vocab) and ':' not in iri[len(self.vocab):]:
+                compacted = iri[len(self.vocab):]
+            else:
+                for term, term_iri in self.terms.items():
+                    if iri.startswith(term_iri) and len(term) + 1 + len(iri) - len(term_iri) < len(compacted):
+                        compacted = f"{term}:{iri[len(term_iri):]}"
+            self._compacted[iri] = compacted
+        return self._compacted[iri]
+
+
+_EMPTY_CONTEXT = Context()
+
+
+def _transform(data, context, node_key):
+    """
+    Copies a JSON-LD document iteratively (whatever its depth), renaming the properties of each node with
+    'node_key(active context, property)' and applying the @context of the nodes. The input is not modified.
+    """
+    result = [None]
+    stack = [(data, context, result, 0)]
+    while stack:
+        value, active, target, key = stack.pop()
+        if isinstance(value, list):
+            target[key] = [None] * len(value)
+            stack.extend((item, active, target[key], index) for index, item in enumerate(value))
+        elif isinstance(value, dict):
+            if '@context' in value:
+                active = Context.get(value['@context'], active)
+            target[key] = node = {}
+            for property, item in value.items():
+                if property == '@context':
+                    continue
+                property = node_key(active, property)
+                # Reserves the position of the property, to keep the order of the input
+                node[property] = None
+                stack.append((item, active, node, property))
+        else:
+            target[key] = value
+    return result[0]
+
+
+def expand_jsonld(data, context=None):
+    """
+    Returns a copy of a JSON-LD document with the properties expanded to IRIs and without @context. 'context' is an
+    optional initial @context, completed by the @context of the nodes (nested and remote contexts included).
+    """
+    initial = context if isinstance(context, Context) else Context.get(context)
+    return _transform(data, initial, lambda active, property: active.expand(property))
+
+
+def compact_jsonld(data, context):
+    """
+    Returns a copy of an expanded JSON-LD document with the properties compacted with the given @context, which is
+    set on the root node(s).
+    """
+    active = Context.get(context)
+    compacted = _transform(data, active, lambda active, property: property if property.startswith('@') else active.compact(property))
+    for node in (compacted if isinstance(compacted, list) else [compacted]):
+        if isinstance(node, dict):
+            node['@context'] = context
+            node.update({property: node.pop(property) for property in list(node) if property != '@context'})
+    return compacted
@@ -0,0 +1,131 @@
+import functools
+import json
+
+from pathlib import Path
+
+from openMINDS_validation.cache import hash_digest
+from openMINDS_validation.diagnostics import ERROR, WARNING
+from openMINDS_validation.runner import ValidationAborted, version_dependency_digest, schema_cache_key
+from openMINDS_validation.schemas import ExtendsResolver
+from openMINDS_validation.utils import load_json, fetch_remote_schema_extends, version_key
+from openMINDS_validation.validation import InstanceValidator, SchemaTemplateValidator
+
+
+def select_versions(version_file, selected=None):
+    """
+    Returns the versions to validate against, in the order of version_key: the selected ones (comma-separated), all
+    the versions of the versions file by default. Raises ValueError for unknown versions.
+    """
+    versions = [version.strip() for version in selected.split(",") if version.strip()] if selected else list(version_file)
+    unknown = [version for version in versions if version not in version_file]
+    if unknown:
+        raise ValueError(f'Unknown version(s) {", ".join(unknown)}, expected {", ".join(sorted(version_file, key=version_key))}.')
+    return sorted(set(versions), key=version_key)
+
+
+def _validate_versions(validators):
+    """
+    Runs the validator of each version, reporting the validations aborted for a version (e.g. a remote _extends that
+    can't be downloaded) against that version only.
+    """
+    aborted = False
+    for version, validator in validators:
+        validator.matrix_version = version
+        try:
+            validator.validate()
+        except Exception as e:
+            aborted = True
+            validator._error('validate', f'Validation aborted for "{validator.absolute_path}" against "{version}": {e!r}')
+    if aborted:
+        raise ValidationAborted()
+
+
+def validate_instance_matrix_file(path, state):
+    """
+    Parses an instance file once and validates it against each version of state["matrix_versions"], sharing the vocab
+    indexes, schema sources and compiled type rules of each version with the other files.
+    """
+    instance = load_json(path)
+    _validate_versions((version, InstanceValidator(path, state["versions"], state["vocab"], state["sources"],
+                                                   diagnostics=state.get("diagnostics"), instance=instance,
+                                                   version=version, file_name=Path(path).stem))
+                       for version in state["matrix_versions"])
+
+def instance_matrix_cache_key(path, state):
+    return hash_digest(Path(path).read_bytes(), str(path), "matrix",
+                       *[version_dependency_digest(version, state) for version in state["matrix_versions"]])
+
+
+def _resolver(state, version):
+    """
+    Returns the _extends resolver of a version, created once per worker. The local schemas are shared by the resolvers
+    of all the versions, only the remote _extends are resolved per version.
+    """
+    resolvers = state.setdefault("resolvers", {})
+    if version not in resolvers:
+        load_remote = functools.partial(fetch_remote_schema_extends, version_file=state["versions"], version=version)
+        resolvers[version] = ExtendsResolver(load_remote=load_remote, local_schemas=state.setdefault("local_schemas", {}))
+    return resolvers[version]
+
+def validate_schema_matrix_file(path, state):
+    """
+    Parses a schema template once and validates it against each version of state["matrix_versions"], the remote
+    _extends being resolved in each version instead of the build version of the submodule.
+    """
+    schema = load_json(path)
+    _validate_versions((version, SchemaTemplateValidator(path, state["repository"], state["branch"], state["versions"],
+                                                         diagnostics=state.get("diagnostics"), resolver=_resolver(state, version), submodules=state.get("submodules"),
+                                                         schema=schema, version=version))
+                       for version in state["matrix_versions"])
+
+def schema_matrix_cache_key(path, state):
+    return hash_digest(schema_cache_key(path, state), "matrix", *state["matrix_versions"])
+
+
+class CompatibilityMatrix(object):
+    """
+    Version × file table of the results of matrix validations: number of errors and warnings of each file against each
+    version. Diagnostics without version (e.g. a file that can't be parsed) count for all the versions.
+    """
+    def __init__(self, versions):
+        self.versions = versions
+        self.files = {}
+
+    def add(self, result):
+        cells = {version: {"errors": 0, "warnings": 0} for version in self.versions}
+        for diagnostic in result.diagnostics:
+            key = "errors" if diagnostic.severity == ERROR else "warnings" if diagnostic.severity == WARNING else None
+            if key is None:
+                continue
+            for version in ([diagnostic.version] if diagnostic.version in cells else self.versions):
+                cells[version][key] += 1
+        self.files[result.path] = cells
+
+    def compatible(self, version):
+        """
+        Returns the number of files validated without error against the given version.
+        """
+        return sum(1 for cells in self.files.values() if not cells[version]["errors"])
+
+    def table(self):
+        """
+        Returns the table as text: a row per file, a column per version and a final row counting the compatible files.
+        """
+        def cell(counts):
+            if counts["errors"]:
+                return f"fail ({counts['errors']})"
+            return "warn" if counts["warnings"] else "pass"
+
+        rows = [["file", *self.versions]]
+        rows.extend([path, *(cell(cells[version]) for version in self.versions)] for path, cells in self.files.items())
+        rows.append(["compatible", *(f"{self.compatible(version)}/{len(self.files)}" for version in self.versions)])
+        widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+        lines = ["  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows]
+        lines.insert(1, "  ".join("-" * width for width in widths))
+        lines.insert(len(lines) - 1, lines[1])
+        return "\n".join(lines)
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump({"versions": self.versions, "compatible": {version: self.compatible(version) for version in self.versions},
+                       "files": self.files}, f, indent=2)
@@ -0,0 +1,152 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from collections import Counter
+
+# Instrumentation is off unless enabled, spans and counters then cost a global lookup
+_profiler = None
+_disabled_span = contextlib.nullcontext()
+
+
+class Profiler(object):
+    """
+    Records timed spans (function calls, validated files) and counters (network requests, cache hits and misses,
+    filesystem scans) of the current process. With 'memory', the tracemalloc peak of the outermost spans is recorded
+    as well.
+    """
+    def __init__(self, memory:bool=False):
+        self.memory = memory
+        self.pid = os.getpid()
+        self.events = []
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def span(self, name, category="function", **args):
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        measure_memory = self.memory and depth == 0 and threading.current_thread() is threading.main_thread()
+        if measure_memory:
+            start_memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            self._local.depth = depth
+            if measure_memory:
+                args["peak_kb"] = round(max(tracemalloc.get_traced_memory()[1] - start_memory, 0) / 1024, 1)
+            self.record(name, start, duration, category, **args)
+
+    def record(self, name, start, duration, category="function", **args):
+        """
+        Records a span measured by the caller, start and duration being in nanoseconds (time.perf_counter_ns).
+        """
+        self.events.append({"name": name, "cat": category, "ts": start // 1000, "dur": duration // 1000,
+                            "pid": os.getpid(), "tid": threading.get_ident(), "args": args})
+
+    def drain(self):
+        """
+        Returns the events and counters recorded so far and resets them, e.g. to send them to the parent process.
+        """
+        recorded = {"events": self.events, "counters": dict(self.counters)}
+        self.events = []
+        self.counters = Counter()
+        return recorded
+
+    def merge(self, recorded):
+        self.events.extend(recorded["events"])
+        self.counters.update(recorded["counters"])
+
+    def summary(self):
+        """
+        Returns the JSON report: total and maximum wall time per function, wall time (and memory peak) per file,
+        and counters.
+        """
+        functions = {}
+        files = []
+        for event in self.events:
+            if event["cat"] == "file":
+                files.append({"file": event["args"].get("file", event["name"]), "wall_time_ms": event["dur"] / 1000,
+                              **{key: value for key, value in event["args"].items() if key != "file"}})
+                continue
+            function = functions.setdefault(event["name"], {"calls": 0, "total_ms": 0, "max_ms": 0})
+            function["calls"] += 1
+            function["total_ms"] += event["dur"] / 1000
+            function["max_ms"] = max(function["max_ms"], event["dur"] / 1000)
+        for function in functions.values():
+            function["total_ms"] = round(function["total_ms"], 3)
+        return {"functions": dict(sorted(functions.items(), key=lambda item: -item[1]["total_ms"])),
+                "files": sorted(files, key=lambda file: -file["wall_time_ms"]),
+                "counters": dict(sorted(self.counters.items()))}
+
+    def chrome_trace(self):
+        """
+        Returns the events in the Chrome trace event format (chrome://tracing, Perfetto), the counters being
+        attached to the final counter event.
+        """
+        events = [dict(event, ph="X") for event in self.events]
+        if events:
+            end = max(event["ts"] + event["dur"] for event in events)
+            events.append({"name": "counters", "ph": "C", "ts": end, "pid": os.getpid(), "args": dict(self.counters)})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path, format="json"):
+        content = self.chrome_trace() if format == "chrome" else self.summary()
+        with open(path, "w") as f:
+            json.dump(content, f, indent=2)
+
+
+def enable(memory:bool=False):
+    global _profiler
+    _profiler = Profiler(memory)
+    return _profiler
+
+def get_profiler():
+    """
+    Returns the Profiler of the process, None if instrumentation is disabled.
+    """
+    return _profiler
+
+def options():
+    """
+    Returns the options to enable the instrumentation in worker processes, None if it is disabled.
+    """
+    return {"memory": _profiler.memory} if _profiler is not None else None
+
+
+def span(name, category="function", **args):
+    """
+    Context manager timing a block, a no-op when instrumentation is disabled.
+    """
+    if _profiler is None:
+        return _disabled_span
+    return _profiler.span(name, category, **args)
+
+def count(counter, increment=1):
+    if _profiler is not None:
+        with _profiler._lock:
+            _profiler.counters[counter] += increment
+
+def profiled(function):
+    """
+    Decorator timing each call of a function or method, named after its qualified name.
+    """
+    name = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if _profiler is None:
+            return function(*args, **kwargs)
+        with _profiler.span(name):
+            return function(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,326 @@
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import sys
+
+from pathlib import Path, PurePath
+
+from openMINDS_validation import profiling
+from openMINDS_validation.cache import hash_digest, code_digest
+from openMINDS_validation.diagnostics import Diagnostic, DiagnosticCollector, ERROR, WARNING
+from openMINDS_validation.instances import IdIndex
+from openMINDS_validation.utils import VocabManager, Versions, clone_central, get_sources_commit, get_latest_version_commit, \
+    schema_index
+from openMINDS_validation.validation import InstanceValidator, SchemaTemplateValidator
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
+
+# State shared by all the validations of a worker (versions file, vocab, schema sources...)
+_worker_state = {}
+
+
+class LogCapture(logging.Handler):
+    """
+    Logging handler collecting the formatted messages emitted during the validation of a file. The diagnostics are
+    reported by the validators to the given DiagnosticCollector, only the messages not emitted by a validator check
+    (e.g. from load_json) are turned into diagnostics and added to it.
+    """
+    def __init__(self, path, diagnostics):
+        super().__init__(level=logging.WARNING)
+        self.setFormatter(logging.Formatter(LOG_FORMAT))
+        self.path = str(path)
+        self.messages = []
+        self.diagnostics = diagnostics
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        if getattr(record, "diagnostic", None) is None:
+            severity = ERROR if record.levelno >= logging.ERROR else WARNING
+            self.diagnostics.add(Diagnostic(self.path, "", record.funcName, severity, record.getMessage()))
+
+
+class ValidationAborted(Exception):
+    """
+    Raised by validations that were aborted after reporting the cause themselves (e.g. for one of the versions of a
+    matrix validation), the result is then not cached.
+    """
+
+
+class ValidationResult(object):
+    def __init__(self, path, messages, diagnostics, cached:bool=False):
+        self.path = path
+        self.messages = messages
+        self.diagnostics = diagnostics
+        self.cached = cached
+        # Instrumentation recorded by the worker, merged by the parent process (see profiling.Profiler.drain)
+        self.profile = None
+
+    @property
+    def errors(self):
+        return sum(1 for diagnostic in self.diagnostics if diagnostic.severity == ERROR)
+
+    @property
+    def warnings(self):
+        return sum(1 for diagnostic in self.diagnostics if diagnostic.severity == WARNING)
+
+    def report(self):
+        """
+        Prints the captured messages followed by the status of the file.
+        """
+        for message in self.messages:
+            print(message)
+        suffix = " (cached)" if self.cached else ""
+        if self.errors:
+            print(f"❌ Validation failed for {self.path}{suffix}")
+        elif self.warnings:
+            print(f"⚠️ Validation passed with warnings for {self.path}{suffix}")
+        else:
+            print(f"✅ Validation passed for {self.path}{suffix}")
+
+
+def load_instance_state(versions, check_links=False):
+    """
+    Builds the state shared by the instance validations: versions file, vocab (with the indexes of the given versions),
+    schema sources (only the given versions are checked out, all of them if none is given) and, to check the linked
+    instances, the @id index of the repository.
+    """
+    state = {
+        "versions": Versions("./versions.json").versions,
+        "vocab": VocabManager("./types.json", "./properties.json"),
+    }
+    commit = None
+    for version in sorted(set(versions) & set(state["versions"])):
+        # All the versions are checked out from the same commit
+        state["sources"] = clone_central(version=version, commit=commit)
+        commit = get_sources_commit(state["sources"])
+    if "sources" not in state:
+        state["sources"] = clone_central()
+    for version in versions:
+        state["vocab"].index(version)
+        # Built once here rather than concurrently by the workers
+        schema_index(version, state["sources"])
+    if check_links:
+        state["id_index"] = IdIndex(".").load()
+    return state
+
+
+def validate_instance_file(path, state):
+    InstanceValidator(path, state["versions"], state["vocab"], state["sources"], diagnostics=state.get("diagnostics"),
+                      id_index=state.get("id_index")).validate()
+
+def validate_schema_file(path, state):
+    validator = SchemaTemplateValidator(path, state["repository"], state["branch"], state["versions"],
+                                        diagnostics=state.get("diagnostics"), resolver=state.get("resolver"),
+                                        submodules=state.get("submodules"))
+    # The _extends resolver is shared by all the validations of the worker
+    state.setdefault("resolver", validator.resolver)
+    validator.validate()
+
+
+# Digests of the inputs shared by many files, computed once per worker
+_dependency_digests = {}
+
+def instance_cache_key(path, state):
+    """
+    Hashes an instance file and its path (the file name is checked against the @id) together with its inputs: the
+    versions.json entry of its version, the vocab files, the schema sources commit, the validation code and, when
+    linked instances are checked, the @id index of the version.
+    """
+    return hash_digest(Path(path).read_bytes(), str(path), version_dependency_digest(PurePath(path).parts[1], state))
+
+def version_dependency_digest(version, state):
+    """
+    Hashes the inputs of the instance validations against a version, see instance_cache_key.
+    """
+    if version not in _dependency_digests:
+        parts = [json.dumps(state["versions"].get(version), sort_keys=True), state["vocab"].digest,
+                 get_sources_commit(state["sources"]), code_digest()]
+        if state.get("id_index") is not None:
+            parts.append(json.dumps(state["id_index"].ids.get(version, {}), sort_keys=True))
+        _dependency_digests[version] = hash_digest(*parts)
+    return _dependency_digests[version]
+
+def schema_cache_key(path, state):
+    """
+    Hashes a schema template and its path together with its inputs: the repository and branch it belongs to, versions.json
+    (which pins the commits of remote _extends), the local _extends chain and the validation code.
+    """
+    if "versions" not in _dependency_digests:
+        _dependency_digests["versions"] = hash_digest(json.dumps(state["versions"], sort_keys=True), code_digest())
+    content = Path(path).read_bytes()
+    parts = [content, str(path), state["repository"], state["branch"], _dependency_digests["versions"]]
+
+    extends = json.loads(content).get('_extends')
+    seen = set()
+    while extends and not extends.startswith('/') and extends not in seen:
+        seen.add(extends)
+        extends_path = Path('./schemas') / extends
+        if not extends_path.exists():
+            parts.append(f"missing:{extends}")
+            break
+        extends_content = extends_path.read_bytes()
+        parts.append(extends_content)
+        extends = json.loads(extends_content).get('_extends')
+    if extends and extends.startswith('/'):
+        parts.append(extends)
+        # Remote _extends compared against 'latest' follow the latest version branch of the module
+        modules = state["versions"].get('latest', {}).get("modules", {})
+        module = modules.get(extends.split('/')[1]) or modules.get(extends.split('/')[1].upper())
+        if module:
+            parts.append(get_latest_version_commit(module))
+    return hash_digest(*parts)
+
+
+def _init_worker(state):
+    _worker_state.clear()
+    _worker_state.update(state)
+    # Messages are captured per file and printed by the parent process
+    logging.getLogger().handlers.clear()
+    profiler = profiling.get_profiler()
+    # Forked workers start with a profiler of their own instead of a copy of the parent's one
+    if state.get("profile") is not None and (profiler is None or profiler.pid != os.getpid()):
+        profiling.enable(**state["profile"])
+
+def _capture(label, function, state, *args):
+    """
+    Runs function(*args, state) with a DiagnosticCollector as state["diagnostics"], for the validators to report to,
+    and returns the diagnostics and the log messages in a ValidationResult.
+    """
+    collector = DiagnosticCollector()
+    capture = LogCapture(label, collector)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(capture)
+    state["diagnostics"] = collector
+    aborted = False
+    try:
+        function(*args, state)
+    except ValidationAborted:
+        aborted = True
+    except Exception as e:
+        aborted = True
+        diagnostic = Diagnostic(str(label), "", "validate", ERROR, f'Validation aborted for "{label}": {e!r}')
+        collector.add(diagnostic)
+        logging.error(diagnostic.message, extra={"diagnostic": diagnostic})
+    finally:
+        root_logger.removeHandler(capture)
+        del state["diagnostics"]
+    return ValidationResult(label, capture.messages, collector.diagnostics), aborted
+
+def _validate(path):
+    with profiling.span(str(path), "file", file=str(path)):
+        result = _validate_file(path)
+    if profiling.get_profiler() is not None:
+        result.profile = profiling.get_profiler().drain()
+    return result
+
+def _validate_file(path):
+    result_cache = _worker_state.get("result_cache")
+    key = None
+    if result_cache is not None:
+        try:
+            key = _worker_state["cache_key"](path, _worker_state)
+        except Exception:
+            # The file is validated without cache, e.g. when it is not valid JSON
+            key = None
+        cached = result_cache.get(key) if key else None
+        if cached is not None:
+            # The diagnostics are reported against the validated file
+            diagnostics = [Diagnostic(**dict(diagnostic, file=str(path))) for diagnostic in cached["diagnostics"]]
+            return ValidationResult(path, cached["messages"], diagnostics, cached=True)
+
+    result, aborted = _capture(path, _worker_state["validate_file"], _worker_state, path)
+    # Aborted validations may be caused by transient failures (e.g. network) and are not cached
+    if key and not aborted:
+        result_cache.put(key, result.messages, result.diagnostics)
+    return result
+
+
+@contextlib.contextmanager
+def _in_process(state):
+    """
+    Sets up the current process as a worker, restoring the logging handlers afterwards.
+    """
+    handlers = logging.getLogger().handlers[:]
+    _init_worker(state)
+    try:
+        yield
+    finally:
+        logging.getLogger().handlers[:] = handlers
+
+
+def run_validation(paths, validate_file, state, jobs=1, result_cache=None, cache_key=None):
+    """
+    Validates the given files with 'validate_file(path, state)' over 'jobs' worker processes.
+    The state is sent once to each worker. Results are yielded in the order of 'paths'.
+    If a ResultCache is given, files whose 'cache_key(path, state)' is cached are not validated again and their
+    cached diagnostics are replayed.
+    When instrumentation is enabled (see profiling.enable), the workers record it as well and it is merged into the
+    profiler of the current process.
+    """
+    state = dict(state, validate_file=validate_file, result_cache=result_cache, cache_key=cache_key,
+                 profile=profiling.options())
+    if jobs <= 1 or len(paths) <= 1:
+        with _in_process(state):
+            for path in paths:
+                yield _merge_profile(_validate(path))
+        return
+
+    # Each worker receives the state, no more workers than files are started
+    jobs = min(jobs, len(paths))
+    chunk_size = max(1, min(64, len(paths) // (jobs * 4)))
+    with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(state,)) as pool:
+        for result in pool.imap(_validate, paths, chunksize=chunk_size):
+            yield _merge_profile(result)
+
+def _merge_profile(result):
+    if result.profile is not None:
+        profiling.get_profiler().merge(result.profile)
+        result.profile = None
+    return result
+
+
+def validate_instance_document(label, instance, version, state):
+    InstanceValidator(label, state["versions"], state["vocab"], state["sources"], diagnostics=state.get("diagnostics"),
+                      instance=instance, version=version, id_index=state.get("id_index")).validate()
+
+def _validate_instance_record(label, line, version, state):
+    validate_instance_document(label, json.loads(line), version, state)
+
+def validate_instance_stream(stream, version, state, label="<stdin>"):
+    """
+    Validates the instances of a JSON-lines stream one by one against the given version and yields a result per
+    record, labelled '<label>:<line number>'. Only the current record is kept in memory.
+    """
+    with _in_process(state):
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            record_label = f"{label}:{line_number}"
+            with profiling.span(record_label, "file", file=record_label):
+                result, _ = _capture(record_label, _validate_instance_record, state, record_label, line, version)
+            yield result
+
+
+def collect_paths(sources, pattern):
+    """
+    Expands the given sources into a list of paths:
+        - '-' reads one path per line from stdin.
+        - a directory is searched recursively for files matching pattern.
+        - any other value is used as is.
+    """
+    paths = []
+    for source in sources:
+        if source == '-':
+            paths.extend(line.strip() for line in sys.stdin if line.strip())
+        elif Path(source).is_dir():
+            profiling.count("fs.scans")
+            paths.extend(str(path) for path in sorted(Path(source).rglob(pattern)))
+        else:
+            paths.append(source)
+    return paths
+
+
+def default_jobs():
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
@@ -0,0 +1,112 @@
+from pathlib import Path
+
+from openMINDS_validation.utils import load_json
+
+
+class ExtendsCycleError(ValueError):
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__(f'Cyclic _extends: {" -> ".join(cycle)}.')
+
+
+class FlattenedSchema(object):
+    """
+    Read-only view of a schema template merged with its _extends ancestors.
+    """
+    def __init__(self, properties, required):
+        self.properties = frozenset(properties)
+        self.required = tuple(required)
+
+
+class ExtendsResolver(object):
+    """
+    Resolves the _extends graph of the schema templates of a 'schemas/' directory. Each schema is loaded once and
+    the flattened (properties, required) view of each node is memoized, without modifying the loaded schemas.
+    Remote _extends (starting with "/") are loaded through 'load_remote', if given. The local schemas can be shared
+    with other resolvers (e.g. resolving the remote _extends of other versions) through 'local_schemas'.
+    """
+    def __init__(self, directory="./schemas", load_remote=None, local_schemas=None):
+        self.directory = Path(directory)
+        self._load_remote = load_remote
+        self._schemas = {}
+        self._local_schemas = local_schemas if local_schemas is not None else {}
+        self._flattened = {}
+        self.unloadable = set()
+
+    def load(self, extends_path):
+        """
+        Returns the schema of the given _extends value, None if it can't be found.
+        """
+        schemas = self._schemas if extends_path.startswith("/") else self._local_schemas
+        if extends_path not in schemas:
+            if extends_path.startswith("/"):
+                schema = self._load_remote(extends_path) if self._load_remote else None
+            else:
+                schema_path = self.directory / extends_path
+                schema = load_json(schema_path) if schema_path.exists() else None
+            schemas[extends_path] = schema
+        return schemas[extends_path]
+
+    def ancestors(self, extends_path):
+        """
+        Returns the _extends chain starting at extends_path (included), raising ExtendsCycleError on cycles.
+        """
+        chain = []
+        while extends_path is not None:
+            if extends_path in chain:
+                raise ExtendsCycleError(chain[chain.index(extends_path):] + [extends_path])
+            chain.append(extends_path)
+            schema = self.load(extends_path)
+            extends_path = schema.get('_extends') if schema is not None else None
+        return chain
+
+    def flattened(self, extends_path):
+        """
+        Returns the FlattenedSchema of the given _extends value, None if it can't be found.
+        """
+        if extends_path not in self._flattened:
+            # Raises on cycles before recursing through the parents
+            self.ancestors(extends_path)
+            schema = self.load(extends_path)
+            flattened = None
+            if schema is not None:
+                properties = set(schema.get('properties', {}))
+                # Keeps the declaration order (own required properties first) and removes duplicates
+                required = dict.fromkeys(schema.get('required', []))
+                parent = self.flattened(schema['_extends']) if '_extends' in schema else None
+                if parent is not None:
+                    properties.update(parent.properties)
+                    required.update(dict.fromkeys(parent.required))
+                flattened = FlattenedSchema(properties, required)
+            self._flattened[extends_path] = flattened
+        return self._flattened[extends_path]
+
+    def graph(self):
+        """
+        Returns the _extends graph of the directory: schema path (relative to the directory) -> _extends value.
+        Schemas that can't be loaded (e.g. not valid JSON) have no parent and are listed in 'unloadable'.
+        """
+        graph = {}
+        self.unloadable = set()
+        for schema_path in sorted(self.directory.rglob("*.schema.tpl.json")):
+            extends_path = schema_path.relative_to(self.directory).as_posix()
+            try:
+                schema = self.load(extends_path)
+            except (OSError, ValueError):
+                # Reported by the validation of the schema
+                self.unloadable.add(extends_path)
+                schema = None
+            graph[extends_path] = schema.get('_extends') if isinstance(schema, dict) else None
+        return graph
+
+    def find_cycles(self):
+        """
+        Returns the _extends cycles of the directory, each once.
+        """
+        cycles = {}
+        for extends_path in self.graph():
+            try:
+                self.ancestors(extends_path)
+            except ExtendsCycleError as e:
+                cycles.setdefault(frozenset(e.cycle), e.cycle)
+        return list(cycles.values())
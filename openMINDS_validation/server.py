@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import socketserver
+import time
+
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+from openMINDS_validation import runner, sources, utils
+from openMINDS_validation.client import parse_address
+from openMINDS_validation.runner import load_instance_state, validate_instance_file, validate_instance_document, \
+    validate_schema_file, _capture
+from openMINDS_validation.utils import index_submodules
+
+
+class ValidationServer(object):
+    """
+    Keeps the versions file, vocab, schema sources and caches of an instance or submodule repository loaded between
+    validation requests. Requests are handled one at a time, so that the captured diagnostics do not mix.
+    """
+    def __init__(self, root=".", check_links=False):
+        self.root = Path(root).resolve()
+        self.check_links = check_links
+        self.state = None
+        self.validations = 0
+        self.started = time.time()
+        self.reload()
+
+    def reload(self):
+        """
+        Downloads the versions file and vocab again and checks out the latest schema sources.
+        """
+        sources._resolved_refs.clear()
+        utils._remote_schema_cache.clear()
+        utils._existing_remote_extends.clear()
+        runner._dependency_digests.clear()
+        self.state = load_instance_state([], self.check_links)
+        self.state["submodules"] = index_submodules(self.state["versions"])
+
+    def status(self):
+        return {"root": str(self.root), "versions": sorted(self.state["versions"]),
+                "sources_commit": utils.get_sources_commit(self.state["sources"]), "validations": self.validations,
+                "uptime": round(time.time() - self.started, 1)}
+
+    def validate(self, request):
+        """
+        Validates the instance or schema template file at request["path"] (schema templates also require
+        request["repository"] and request["branch"]), or the instance document request["instance"] against
+        request["version"]. Returns the result as a dictionary.
+        """
+        start = time.perf_counter()
+        if self.check_links:
+            # Follows the instances changed since the previous request
+            self.state["id_index"].load()
+
+        if "instance" in request:
+            if not request.get("version"):
+                raise ValueError("Inline instances require a version.")
+            label = request.get("label") or "<inline>"
+            result, aborted = _capture(label, validate_instance_document, self.state, label, request["instance"], request["version"])
+        elif "path" in request:
+            path = Path(request["path"])
+            if path.is_absolute():
+                if not path.is_relative_to(self.root):
+                    raise ValueError(f'"{path}" is not in {self.root}.')
+                path = path.relative_to(self.root)
+            if path.name.endswith(".schema.tpl.json"):
+                if not request.get("repository") or not request.get("branch"):
+                    raise ValueError("Schema templates require a repository and a branch.")
+                # Schema templates may be edited between requests, the _extends resolver is not kept
+                state = dict(self.state, repository=request["repository"], branch=request["branch"])
+                result, aborted = _capture(str(path), validate_schema_file, state, str(path))
+            else:
+                result, aborted = _capture(str(path), validate_instance_file, self.state, str(path))
+        else:
+            raise ValueError("A path or an instance is required.")
+
+        self.validations += 1
+        return {"path": result.path, "errors": result.errors, "warnings": result.warnings, "aborted": aborted,
+                "messages": result.messages, "diagnostics": [diagnostic._asdict() for diagnostic in result.diagnostics],
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+class ValidationRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of the validation server:
+        - GET /status
+        - POST /validate with a JSON body (see ValidationServer.validate)
+        - POST /reload
+        - POST /shutdown
+    """
+    def _send(self, status, content):
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._send(200, self.server.validation_server.status())
+        else:
+            self._send(404, {"error": f"Unknown endpoint {self.path}."})
+
+    def do_POST(self):
+        validation_server = self.server.validation_server
+        # Browsers can send cross-origin form or text/plain POSTs without preflight, but not JSON ones
+        if self.headers.get("Content-Type", "").split(";")[0].strip().lower() != "application/json":
+            self._send(415, {"error": "Expected a Content-Type: application/json request."})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length)) if length else {}
+            if self.path == "/validate":
+                self._send(200, validation_server.validate(request))
+            elif self.path == "/reload":
+                validation_server.reload()
+                self._send(200, validation_server.status())
+            elif self.path == "/shutdown":
+                self._send(200, {"stopping": True})
+                self.server.stopping = True
+            else:
+                self._send(404, {"error": f"Unknown endpoint {self.path}."})
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e:
+            logging.exception(f"Request {self.path} failed")
+            self._send(500, {"error": repr(e)})
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+
+class UnixHTTPServer(socketserver.UnixStreamServer):
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        return request, ("local", 0)
+
+
+def serve(validation_server, address):
+    """
+    Serves the validation server on 'HOST:PORT' or on a Unix socket path until a shutdown request.
+    """
+    kind, address = parse_address(address)
+    if kind == "unix":
+        if os.path.exists(address):
+            os.unlink(address)
+        http_server = UnixHTTPServer(address, ValidationRequestHandler)
+    else:
+        http_server = HTTPServer(address, ValidationRequestHandler)
+    http_server.validation_server = validation_server
+    http_server.stopping = False
+    try:
+        while not http_server.stopping:
+            http_server.handle_request()
+    finally:
+        http_server.server_close()
+        if kind == "unix" and os.path.exists(address):
+            os.unlink(address)
@@ -0,0 +1,150 @@
+import logging
+import os
+import shutil
+import tempfile
+
+from pathlib import Path
+from git import Repo, GitCommandError
+
+from openMINDS_validation.cache import CACHE_DIR
+from openMINDS_validation.profiling import count, profiled
+
+CENTRAL_REPOSITORY = os.environ.get("OPENMINDS_CENTRAL_REPOSITORY", "https://github.com/openMetadataInitiative/openMINDS.git")
+CENTRAL_REF = os.environ.get("OPENMINDS_CENTRAL_REF", "main")
+
+_resolved_refs = {}
+
+
+class SourceStore:
+    """
+    Stores checkouts of the schema sources of the central repository side by side, keyed by commit.
+    Only 'schemas/<version>/' is checked out, from a shallow and blob-less fetch of the pinned commit.
+    All the checkouts share one object store, so that fetching a new commit only downloads the delta.
+    """
+    def __init__(self, directory=None, repository=None):
+        self.directory = Path(directory or CACHE_DIR) / "sources"
+        self.repository = repository or CENTRAL_REPOSITORY
+        self._git_dir = self.directory / "objects.git"
+
+    def _repo(self):
+        if not self._git_dir.exists():
+            repo = Repo.init(self._git_dir, bare=True)
+            repo.git.remote("add", "origin", self.repository)
+            return repo
+        return Repo(self._git_dir)
+
+    def resolve(self, ref=CENTRAL_REF):
+        """
+        Returns the commit the given branch or tag of the central repository points to.
+        Falls back to the most recent checkout if the remote cannot be reached.
+        """
+        if ref in _resolved_refs:
+            return _resolved_refs[ref]
+        count("network.git_ls_remote")
+        try:
+            refs = self._repo().git.ls_remote("origin", ref).splitlines()
+        except GitCommandError as e:
+            commit = self.latest_checkout()
+            if commit is None:
+                raise
+            logging.warning(f'Using schema sources at commit "{commit}": {e}')
+            return commit
+        if not refs:
+            raise ValueError(f'Unknown reference "{ref}" for "{self.repository}".')
+        _resolved_refs[ref] = refs[0].split("\t")[0]
+        return _resolved_refs[ref]
+
+    def latest_checkout(self):
+        checkouts = [path for path in self.directory.glob("*") if (path / ".commit").exists()]
+        if not checkouts:
+            return None
+        return max(checkouts, key=lambda path: (path / ".commit").stat().st_mtime).name
+
+    def path(self, commit):
+        return self.directory / commit
+
+    def _fetch(self, repo, commit):
+        fetched_file = self._git_dir / "fetched_commits"
+        fetched = fetched_file.read_text().split() if fetched_file.exists() else []
+        if commit not in fetched:
+            count("network.git_fetch")
+            try:
+                repo.git.fetch("--depth=1", "--filter=blob:none", "origin", commit)
+            except GitCommandError:
+                # The remote does not support partial clones
+                repo.git.fetch("--depth=1", "origin", commit)
+            with open(fetched_file, "a") as f:
+                f.write(f"{commit}\n")
+
+    def changed_files(self, old_commit, new_commit, subpath="schemas"):
+        """
+        Returns the files under subpath that differ between two commits (only their trees are fetched).
+        """
+        repo = self._repo()
+        self._fetch(repo, old_commit)
+        self._fetch(repo, new_commit)
+        changed = repo.git.diff("--name-only", "--no-renames", old_commit, new_commit, "--", subpath).splitlines()
+        repo.close()
+        return changed
+
+    @profiled
+    def checkout(self, commit, version=None, refetch:bool=False):
+        """
+        Makes 'schemas/<version>/' (all the versions if None) of the given commit available and returns the root
+        directory of the checkout.
+        """
+        target = self.path(commit)
+        subpath = f"schemas/{version}" if version else "schemas"
+        if refetch and target.exists():
+            shutil.rmtree(target)
+        # The subpaths checked out so far: 'schemas/' only exists partially after version checkouts
+        checked_out = self.checked_out(commit)
+        if subpath in checked_out or "schemas" in checked_out:
+            return target
+
+        repo = self._repo()
+        self._fetch(repo, commit)
+
+        # Checks out in a temporary directory with its own index, then moves the result in place
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=self.directory, prefix=".checkout-") as tmp:
+            env = {"GIT_INDEX_FILE": os.path.join(tmp, "index")}
+            work_tree = os.path.join(tmp, "tree")
+            os.mkdir(work_tree)
+            repo.git.execute(["git", f"--git-dir={self._git_dir}", f"--work-tree={work_tree}", "checkout", commit, "--", subpath], env=env)
+
+            _merge_tree(Path(work_tree) / subpath, target / subpath)
+        (target / ".checked_out").write_text("".join(f"{path}\n" for path in sorted(checked_out | {subpath})))
+        (target / ".commit").write_text(f"{commit}\n")
+        repo.close()
+        return target
+
+    def checked_out(self, commit):
+        """
+        Returns the subpaths ('schemas' or 'schemas/<version>') checked out for the given commit.
+        """
+        marker = self.path(commit) / ".checked_out"
+        if not marker.exists() or not (self.path(commit) / ".commit").exists():
+            return set()
+        return set(marker.read_text().split())
+
+    def prune(self, keep=()):
+        """
+        Removes all the checkouts except the ones of the given commits.
+        """
+        for path in self.directory.glob("*"):
+            if (path / ".commit").exists() and path.name not in keep:
+                shutil.rmtree(path)
+
+
+def _merge_tree(source, destination):
+    """
+    Moves source to destination, keeping the entries already present in destination.
+    """
+    if not destination.exists():
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, destination)
+        return
+    if source.is_dir():
+        for child in source.iterdir():
+            _merge_tree(child, destination / child.name)
@@ -1,41 +1,119 @@
-import base64
 import logging
-import os
+import pickle
 import re
 import shutil
 import json
-import urllib.request
 import urllib.error
 
 from pathlib import Path
-from git import Repo, Git
+from git import Git
 from packaging.utils import canonicalize_version
 from packaging.version import Version
 
+from openMINDS_validation.cache import ArtifactCache, SchemaCache, LsRemoteCache, CACHE_DIR, artifact_url, write_atomic
+from openMINDS_validation.fetch import get_fetcher
+from openMINDS_validation.jsonld import expand_jsonld, compact_jsonld
+from openMINDS_validation.profiling import count, profiled
+from openMINDS_validation.sources import SourceStore
+
 logging.basicConfig(
     level=logging.WARNING,
     format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
 )
 
 _remote_schema_cache = {}
+# Remote _extends known to exist without having been downloaded
+_existing_remote_extends = set()
+_schema_indexes = {}
+_current_sources = Path("sources")
+# Version of the pickled VocabIndex layout, to be increased when the attributes of VocabIndex change
+VOCAB_INDEX_FORMAT = 1
+
+def vocab_index_path(digest, version):
+    """
+    Returns the path of the cached VocabIndex of the given vocab digest and version.
+    """
+    return CACHE_DIR / "vocab" / f"{digest}-{version}-v{VOCAB_INDEX_FORMAT}.pickle"
+
 
 class VocabManager:
     def __init__(self, path_vocab_types, path_vocab_properties):
         # TODO handle dev
-        download_file("https://raw.githubusercontent.com/openMetadataInitiative/openMINDS/refs/heads/main/vocab/properties.json", path_vocab_properties)
-        download_file(
-            "https://raw.githubusercontent.com/openMetadataInitiative/openMINDS/refs/heads/main/vocab/types.json",
-            path_vocab_types)
-        self.vocab_types = load_json(path_vocab_types)
-        self.vocab_properties = load_json(path_vocab_properties)
+        self._path_vocab_types = path_vocab_types
+        self._path_vocab_properties = path_vocab_properties
+        # The cached artifacts are content-addressed: their names are the SHA-256 of the vocab files
+        self.digest = "-".join([
+            download_file(artifact_url("main", "vocab/types.json"), path_vocab_types).name[:16],
+            download_file(artifact_url("main", "vocab/properties.json"), path_vocab_properties).name[:16],
+        ])
+        self._vocab_types = None
+        self._vocab_properties = None
+        self._indexes = {}
+
+    def __getstate__(self):
+        # Only the indexes are sent to the workers, the full vocab is reloaded if needed
+        state = self.__dict__.copy()
+        state["_vocab_types"] = None
+        state["_vocab_properties"] = None
+        return state
+
+    @property
+    def vocab_types(self):
+        if self._vocab_types is None:
+            self._vocab_types = load_json(self._path_vocab_types)
+        return self._vocab_types
+
+    @property
+    def vocab_properties(self):
+        if self._vocab_properties is None:
+            self._vocab_properties = load_json(self._path_vocab_properties)
+        return self._vocab_properties
+
+    @profiled
+    def index(self, version):
+        """
+        Returns the VocabIndex of the given version, loaded from the disk cache or built on first use.
+        """
+        if version not in self._indexes:
+            cache_path = vocab_index_path(self.digest, version)
+            if cache_path.exists():
+                with open(cache_path, "rb") as f:
+                    self._indexes[version] = pickle.load(f)
+            else:
+                self._indexes[version] = VocabIndex(version, self.vocab_types, self.vocab_properties)
+                write_atomic(cache_path, pickle.dumps(self._indexes[version], protocol=pickle.HIGHEST_PROTOCOL))
+        return self._indexes[version]
+
+
+class VocabIndex:
+    """
+    Vocab restricted to a single version, with sets for constant time membership tests:
+        - types: type name -> namespace of the type in this version (None if undefined), for the types of the version.
+        - type_properties: type -> properties allowed for the type in this version.
+        - property_versions: property -> versions the property is used in.
+    """
+    def __init__(self, version, vocab_types, vocab_properties):
+        self.version = version
+        self.types = {}
+        for type_name, type_definition in vocab_types.items():
+            if version not in type_definition['isPartOfVersion']:
+                continue
+            self.types[type_name] = next((namespace_version['namespace'] for namespace_version in type_definition['hasNamespace']
+                                          if version in namespace_version['inVersions']), None)
+
+        type_properties = {}
+        self.property_versions = {}
+        for property, property_definition in vocab_properties.items():
+            self.property_versions[property] = frozenset(property_definition["usedIn"])
+            for type_iri in property_definition["usedIn"].get(version, []):
+                type_properties.setdefault(type_iri, set()).add(property)
+        self.type_properties = {type_iri: frozenset(properties) for type_iri, properties in type_properties.items()}
 
 
 class Versions:
     def __init__(self, path_versions):
         # TODO handle dev, update it to download schema sources for improved validation
-        download_file(
-            "https://raw.githubusercontent.com/openMetadataInitiative/openMINDS/refs/heads/pipeline/versions.json",
-            path_versions)
+        download_file(artifact_url("pipeline", "versions.json"), path_versions)
         self.versions = load_json(path_versions)
 
 def check_newline_end_of_file(file_path):
@@ -50,23 +128,50 @@ def load_json(file_path):
         json_file = json.load(f)
     return json_file
 
+@profiled
 def download_file(url, path):
+    """
+    Copies the artifact at url to path, going through the local artifact cache, and returns the path of the cached artifact.
+    Raises urllib.error.URLError if the artifact can neither be downloaded nor served from the cache.
+    """
     try:
-        urllib.request.urlretrieve(url, path)
+        cached_path = ArtifactCache().fetch(url)
     except (urllib.error.URLError, IOError) as e:
-        logging.error(e)
+        logging.error(f'Unable to retrieve "{url}": {e}')
+        raise
+    shutil.copyfile(cached_path, path)
+    return cached_path
+
+@profiled
+def clone_central(refetch:bool=False, version=None, commit=None):
+    """
+    Makes the schema sources of the central repository available and returns their root directory.
+    Only 'schemas/<version>/' is fetched when a version is given, at the given commit or at the current
+    commit of the central branch otherwise.
+    """
+    global _current_sources
+    store = SourceStore()
+    commit = commit or store.resolve()
+    _current_sources = store.checkout(commit, version, refetch=refetch)
+    if refetch:
+        _schema_indexes.clear()
+    return _current_sources
+
+def get_sources_commit(sources="sources"):
+    """
+    Returns the commit of the central repository the sources were checked out from, None if unknown.
+    """
+    commit_file = Path(sources) / ".commit"
+    return commit_file.read_text().strip() if commit_file.exists() else None
 
-def clone_central(refetch:bool=False):
-    if refetch and os.path.exists("sources"):
-        shutil.rmtree("sources")
-    if not os.path.exists("sources"):
-        Repo.clone_from("https://github.com/openMetadataInitiative/openMINDS.git", "sources")
-        shutil.rmtree("sources/.git")
+def _ls_remote_heads(repository):
+    count("network.git_ls_remote")
+    return Git().ls_remote('--heads', repository)
 
+@profiled
 def get_latest_version_commit(module):
     # Retrieves relevant commit for 'latest'
-    git_instance = Git()
-    branches = git_instance.ls_remote('--heads', module["repository"]).splitlines()
+    branches = LsRemoteCache().heads(module["repository"], _ls_remote_heads).splitlines()
     semantic_to_branchname = {}
     branch_commit_map = {y[1]: y[0] for y in [x.split("\trefs/heads/") for x in branches] if
                         re.match("v[0-9]+.*", y[1])}
@@ -79,71 +184,149 @@ def get_latest_version_commit(module):
     latest_branch_name = semantic_to_branchname[version_numbers[0]]
     return branch_commit_map[latest_branch_name]
 
-def fetch_remote_schema_extends(extends_value, version_file, version):
-    if extends_value in _remote_schema_cache:
-        return _remote_schema_cache[extends_value]
-
+def resolve_remote_extends(extends_value, version_file, version):
+    """
+    Returns the (repository name, path, commit) of a remote _extends value for the given version, None if the module
+    is not part of the version.
+    """
     m = version_file[version]["modules"]
     module_name_extends = extends_value.split('/')[1]
     module = m.get(module_name_extends) or m.get(module_name_extends.upper())
+    if module is None:
+        return None
 
     if version == 'latest':
         commit = get_latest_version_commit(module)
     else:
         commit = module['commit']
+    return Path(module['repository']).stem, '/'.join(extends_value.split('/')[2:]), commit
 
-    extends_url = f"https://api.github.com/repos/openMetadataInitiative/{Path(module['repository']).stem}/contents/{'/'.join(extends_value.split('/')[2:])}?ref={commit}"
-
-    try:
-        with urllib.request.urlopen(extends_url) as response:
-            response_formatted = json.load(response)
-            decoded = base64.b64decode(response_formatted["content"]).decode("utf-8")
-            schema = json.loads(decoded)
-            _remote_schema_cache[extends_value] = schema
-            return schema
-    except urllib.error.HTTPError as e:
-        logging.error(f"Error loading remote schema: {e}")
+@profiled
+def fetch_remote_schema_extends(extends_value, version_file, version):
+    cache_key = resolve_remote_extends(extends_value, version_file, version)
+    if cache_key is None:
+        # Reported by check_extends
         return None
+    if cache_key in _remote_schema_cache:
+        count("cache.remote_schemas.hit")
+        return _remote_schema_cache[cache_key]
 
-def find_openminds_class(version, class_name):
+    schema_cache = SchemaCache()
+    schema = schema_cache.get(*cache_key)
+    if schema is None:
+        schema = get_fetcher().fetch_json(*cache_key)
+        if schema is None:
+            logging.error(f'Error loading remote schema: "{extends_value}" not found.')
+        else:
+            schema_cache.put(*cache_key, schema)
+    # Missing schemas are remembered as well, to avoid requesting them again
+    _remote_schema_cache[cache_key] = schema
+    return schema
+
+@profiled
+def remote_extends_exists(extends_value, version_file, version):
     """
-    Imports a class from any available submodule.
+    Checks the existence of a remote _extends value, without downloading it if it is not cached yet.
     """
-    directory = Path(f"./sources/schemas/{version}/")
-    camel_case = class_name[:1].lower() + class_name[1:]
+    cache_key = resolve_remote_extends(extends_value, version_file, version)
+    if cache_key is None:
+        return False
+    if cache_key in _remote_schema_cache:
+        count("cache.remote_schemas.hit")
+        return _remote_schema_cache[cache_key] is not None
+    if cache_key in _existing_remote_extends:
+        count("cache.remote_schemas.hit")
+        return True
+    schema = SchemaCache().get(*cache_key)
+    if schema is not None:
+        _remote_schema_cache[cache_key] = schema
+        return True
+    # Only the existing schemas are remembered, a failed request may be transient
+    if get_fetcher().exists(*cache_key):
+        _existing_remote_extends.add(cache_key)
+        return True
+    return False
 
-    # Search for exact filename matches
-    for case in [camel_case, class_name]:
-        for file_path in directory.glob(f"**/{case}.schema.omi.json"):
-            return json.loads(file_path.read_text())
-    return None
+@profiled
+def prefetch_remote_extends(extends_values, version_file, version):
+    """
+    Downloads the given remote _extends values concurrently into the schema caches.
+    """
+    get_fetcher().map(lambda extends_value: fetch_remote_schema_extends(extends_value, version_file, version), sorted(set(extends_values)))
 
-def expand_jsonld(data, context=None):
+def index_submodules(version_file):
     """
-    Recursively expands JSON-LD.
+    Maps the (repository, branch) of each submodule to the first version using it (see version_key) and to the
+    name of the module.
     """
-    if isinstance(data, list):
-        return [expand_jsonld(item, context) for item in data]
-    elif not isinstance(data, dict):
-        return data
+    submodules = {}
+    for version_number in sorted(version_file.keys(), key=version_key):
+        for module_name, module in version_file[version_number]["modules"].items():
+            submodules.setdefault((module.get("repository"), module.get("branch")), (version_number, module_name))
+    return submodules
 
-    if not context:
-        context = data.get('@context', {})
+class SchemaIndex:
+    """
+    Maps the class names of a version to their schema files, built once by scanning the sources.
+    The index is stored next to the sources and rebuilt when the sources commit changes.
+    """
+    def __init__(self, version, sources="sources", save:bool=True):
+        self.directory = Path(sources) / "schemas" / version
+        self.commit = get_sources_commit(sources)
+        self._index_path = Path(sources) / f".schema_index_{version}.json"
+        # Versions missing from the checkout are not indexed on disk, to be indexed once checked out
+        self._save = save and self.commit is not None and self.directory.is_dir()
+        self.files = self._load() or self._build()
+        self._schemas = {}
 
-    for prop in data.copy().keys():
-        value = expand_jsonld(data[prop], context)
-        if prop.startswith("@"):
-            continue
-        elif (prefix := prop.split(':',1)[0]) in context.keys():
-            data[context[prefix] + prop] = value
-            del data[prop]
-        else:
-            data[context['@vocab'] + prop] = value
-            del data[prop]
+    def _load(self):
+        if not self._save or not self._index_path.exists():
+            return None
+        with open(self._index_path) as f:
+            index = json.load(f)
+        # Empty indexes may have been saved for versions missing from the checkout
+        return index["files"] if index.get("commit") == self.commit and index["files"] else None
+
+    @profiled
+    def _build(self):
+        count("fs.scans")
+        files = {}
+        for file_path in sorted(self.directory.rglob("*.schema.omi.json")):
+            files.setdefault(file_path.name[:-len(".schema.omi.json")], str(file_path.relative_to(self.directory)))
+        if self._save:
+            # Workers may load the index while another one writes it
+            write_atomic(self._index_path, json.dumps({"commit": self.commit, "files": files}).encode("utf-8"))
+        return files
 
-    if '@context' in data:
-        del data['@context']
-    return data
+    def get(self, class_name):
+        """
+        Returns the parsed schema of a class given in camelCase or PascalCase, None if not found.
+        """
+        camel_case = class_name[:1].lower() + class_name[1:]
+        for case in [camel_case, class_name]:
+            if case in self._schemas:
+                return self._schemas[case]
+            if case in self.files:
+                schema = json.loads((self.directory / self.files[case]).read_text())
+                self._schemas[case] = schema
+                return schema
+        return None
+
+@profiled
+def find_openminds_class(version, class_name, sources=None):
+    """
+    Imports a class from any available submodule.
+    """
+    return schema_index(version, sources).get(class_name)
+
+def schema_index(version, sources=None):
+    """
+    Returns the SchemaIndex of a version of the sources, loaded or built once per process.
+    """
+    sources = Path(sources) if sources is not None else _current_sources
+    if (sources, version) not in _schema_indexes:
+        _schema_indexes[(sources, version)] = SchemaIndex(version, sources)
+    return _schema_indexes[(sources, version)]
 
 def version_key(version: str)->float:
     """
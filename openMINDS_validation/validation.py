@@ -1,27 +1,94 @@
 import re
 import logging
-import urllib.request
-import urllib.error
+import time
 from pathlib import Path, PurePath
 
-from openMINDS_validation.utils import VocabManager, Versions, load_json, get_latest_version_commit, version_key, \
-    find_openminds_class, clone_central, expand_jsonld, fetch_remote_schema_extends
+from openMINDS_validation.diagnostics import DiagnosticCollector, DiagnosticReporter, json_pointer
+from openMINDS_validation.jsonld import Context
+from openMINDS_validation.profiling import get_profiler, profiled
+from openMINDS_validation.schemas import ExtendsResolver, ExtendsCycleError
+from openMINDS_validation.utils import VocabManager, Versions, load_json, find_openminds_class, clone_central, \
+    fetch_remote_schema_extends, remote_extends_exists, index_submodules
 
 logging.basicConfig(
     level=logging.WARNING,
     format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
 )
 
-class SchemaTemplateValidator(object):
-    def __init__(self, absolute_path, repository=None, branch=None):
+_VALUE_TYPE_NAMES = {list: 'an array', str: 'a string', dict: 'a dictionary'}
+
+# Rules compiled per (sources, version, type)
+_type_rules = {}
+
+
+class TypeRules(object):
+    """
+    Rules of an openMINDS type compiled once from its schema: required and optional properties, the expected
+    Python type of their values and the types that linked properties can reference.
+    """
+    def __init__(self, openminds_class):
+        properties = openminds_class.get('properties', {})
+        self.required = tuple(openminds_class.get('required', []))
+        self.optional = tuple(property for property in properties if property not in set(self.required))
+        self.expected_types = {property: self._expected_type(definition) for property, definition in properties.items()}
+        self.linked_types = {property: frozenset(definition['_linkedTypes']) for property, definition in properties.items()
+                             if '_linkedTypes' in definition}
+
+    @staticmethod
+    def _expected_type(definition):
+        if 'type' in definition:
+            return {'array': list, 'string': str}.get(definition['type'])
+        if '_embeddedTypes' in definition or '_linkedTypes' in definition:
+            return dict
+        return None
+
+
+def compile_type_rules(version, type_name, sources=None):
+    """
+    Returns the TypeRules of the given type, None if no schema is found.
+    """
+    key = (str(sources), version, type_name)
+    if key not in _type_rules:
+        openminds_class = find_openminds_class(version, type_name, sources)
+        _type_rules[key] = TypeRules(openminds_class) if openminds_class is not None else None
+    return _type_rules[key]
+
+
+class SchemaTemplateValidator(DiagnosticReporter):
+    def __init__(self, absolute_path, repository=None, branch=None, versions=None, diagnostics=None, resolver=None,
+                 submodules=None, schema=None, version=None):
+        """
+        'versions', 'resolver' and 'submodules' (see index_submodules) can be provided to share an already loaded
+        versions file, ExtendsResolver and submodule index between validators, otherwise they are created.
+        An already parsed 'schema' can be given, and remote _extends can be checked against an explicit 'version'
+        instead of the build version of the submodule.
+        """
         self.absolute_path = absolute_path
-        self.schema = load_json(absolute_path)
+        self.diagnostics = diagnostics if diagnostics is not None else DiagnosticCollector()
+        self.schema = schema if schema is not None else load_json(absolute_path)
         self.repository = repository
         self.branch = branch
+        self.version = version
         self.openMINDS_build_version = None
 
-        self.version_file = Versions("./versions.json").versions
+        self.version_file = versions if versions is not None else Versions("./versions.json").versions
+        self.resolver = resolver if resolver is not None else ExtendsResolver(load_remote=self.load_remote_schema)
+        self.submodules = submodules if submodules is not None else index_submodules(self.version_file)
+
+    def build_version(self):
+        """
+        Returns the openMINDS version the submodule is built for: the first version (see version_key) using the
+        repository and branch of the submodule, 'latest' otherwise. An explicit version takes precedence.
+        """
+        if self.version is not None:
+            return self.version
+        version_number, _ = self.submodules.get((self.repository, self.branch), ('latest', None))
+        return version_number
 
+    def load_remote_schema(self, extends_path):
+        return fetch_remote_schema_extends(extends_path, self.version_file, self.openMINDS_build_version or self.build_version())
+
+    @profiled
     def check_attype(self):
         """
         Validates the format of the _type in the schema definition:
@@ -30,8 +97,9 @@ class SchemaTemplateValidator(object):
         if '_type' in self.schema:
             type_schema_name = re.split("[:/]", self.schema['_type'])[-1]
             if not type_schema_name[0].isupper():
-                logging.error(f'First character of _type "{type_schema_name}" should be uppercase.')
+                self._error('check_attype', f'First character of _type "{type_schema_name}" should be uppercase.', '/_type')
 
+    @profiled
     def check_extends(self):
         """
         Validates the existence of schema for the _extends property.
@@ -42,100 +110,63 @@ class SchemaTemplateValidator(object):
         location = 'remote' if self.schema['_extends'].startswith("/") else './schemas/'
         # _extends located in other repository
         if location == 'remote':
-            # Needs optimization: finding the corresponding openMINDS version and module
-            versions_spec = sorted(list(self.version_file.keys()), key=version_key)
-            module_name_extends = self.schema['_extends'].split('/')[1]
-            extends_url = None
-            for version_number in versions_spec:
-                m = self.version_file[version_number]["modules"]
-                self.openMINDS_build_version = version_number
-
-                matched_extends_submodule = any(
-                    submodule.get("repository") == self.repository and
-                    submodule.get("branch") == self.branch
-                    for submodule in m.values()
-                )
-
-                module = m.get(module_name_extends) or m.get(module_name_extends.upper())
-                if matched_extends_submodule:
-                    extends_url = f"https://api.github.com/repos/openMetadataInitiative/{Path(module['repository']).stem}/contents/{'/'.join(self.schema['_extends'].split('/')[2:])}?ref={module['commit']}"
-                    break
-
-                # By default, '_extends' is compared against 'latest'
-                elif version_number == 'latest':
-                    commit = get_latest_version_commit(module)
-                    extends_url = f'https://api.github.com/repos/openMetadataInitiative/{Path(module["repository"]).stem}/contents/{"/".join(self.schema["_extends"].split("/")[2:])}?ref={commit}'
-                    break
-            try:
-                urllib.request.urlopen(extends_url)
-            except urllib.error.HTTPError:
-                logging.error(f'Schema not found for the property _extends "{self.schema["_extends"]}".')
+            # By default, '_extends' is compared against 'latest'
+            self.openMINDS_build_version = self.build_version()
+            if not remote_extends_exists(self.schema['_extends'], self.version_file, self.openMINDS_build_version):
+                self._error('check_extends', f'Schema not found for the property _extends "{self.schema["_extends"]}".', '/_extends')
         # _extends located in same repository
         else:
             # Checks for openMINDS_actions/schemas/_extends
             path_extends_schema = f"{location}{self.schema['_extends']}"
-            try:
-                open(path_extends_schema, 'r')
-            except FileNotFoundError:
-                logging.error(f'Schema not found for the property _extends at "{self.schema["_extends"]}".')
+            if not Path(path_extends_schema).exists():
+                self._error('check_extends', f'Schema not found for the property _extends at "{self.schema["_extends"]}".', '/_extends')
 
+    @profiled
     def check_required(self):
         """
-        Validates required properties against the properties defined in the schema definition.
+        Validates required properties (including the inherited ones) against the properties defined in the schema
+        definition and its _extends ancestors.
         """
-        def load_schema(path):
-            if path.startswith("/"):
-                return fetch_remote_schema_extends(path, self.version_file, self.openMINDS_build_version)
-            return load_json(f'./schemas/{path}')
-
-        def _check_required_extends(extends_path, required_property):
-            schema = load_schema(extends_path)
-            if required_property not in schema['properties']:
-                if '_extends' in schema:
-                    return _check_required_extends(schema['_extends'], required_property)
-                logging.error(f'Missing required property "{required_property}" in the schema definition.')
-            return
-
-        def _retrieve_inherited_required_properties(extends_path):
-            schema = load_schema(extends_path)
-            inherited_properties_required = schema.get('required', [])
-            if '_extends' in schema:
-                inherited_properties_required.extend(_retrieve_inherited_required_properties(schema['_extends']))
-            return inherited_properties_required
-
         if 'required' not in self.schema:
             return
         if '_type' not in self.schema and '_extends' not in self.schema:
             return
 
-        required_properties = self.schema.get('required', [])
+        properties = set(self.schema.get('properties', {}))
+        required_properties = dict.fromkeys(self.schema['required'])
         if '_extends' in self.schema:
-            required_properties.extend(_retrieve_inherited_required_properties(self.schema['_extends']))
+            try:
+                inherited = self.resolver.flattened(self.schema['_extends'])
+            except ExtendsCycleError as e:
+                self._error('check_required', str(e), '/_extends')
+                return
+            if inherited is not None:
+                properties.update(inherited.properties)
+                required_properties.update(dict.fromkeys(inherited.required))
 
         for required_property in required_properties:
-            if required_property not in self.schema['properties'].keys():
-                if '_extends' in self.schema:
-                    _check_required_extends(self.schema['_extends'], required_property)
-                    continue
-                logging.error(f'Missing required property "{required_property}" in the schema definition.')
+            if required_property not in properties:
+                self._error('check_required', f'Missing required property "{required_property}" in the schema definition.', '/required')
 
+    @profiled
     def check_allowed_keys(self):
         """
         Validates that keys conform to the openMINDS schema specification.
         """
         for key in self.schema:
             if key not in {"_categories", "_extends", "_type", "properties", "required"}:
-                logging.error(f'Unknown key "{key}".')
+                self._error('check_allowed_keys', f'Unknown key "{key}".', json_pointer(key))
 
         for property_name, property_definition in self.schema.get('properties', {}).items():
             for key in property_definition:
                 if key not in {"_embeddedCategories", "_embeddedTypes", "_formats", "_instruction", "_linkedCategories", "_linkedTypes", "exclusiveMaximum", "exclusiveMinimum", "items", "maxItems", "maximum", "minItems", "minimum", "type", "uniqueItems"}:
-                    logging.error(f'Unknown key "{key}" under property "{property_name}".')
+                    self._error('check_allowed_keys', f'Unknown key "{key}" under property "{property_name}".', json_pointer('properties', property_name, key))
                 if key == "items":
                     for items_key in property_definition.get('items', {}):
                         if items_key not in {"_formats", "exclusiveMaximum", "exclusiveMinimum", "maximum", "minimum", "type"}:
-                            logging.error(f'Unknown key "{items_key}" under "items" for property "{property_name}".')
+                            self._error('check_allowed_keys', f'Unknown key "{items_key}" under "items" for property "{property_name}".', json_pointer('properties', property_name, 'items', items_key))
 
+    @profiled
     def validate(self):
         """
         Runs all the tests defined in SchemaTemplateValidator.
@@ -145,55 +176,127 @@ class SchemaTemplateValidator(object):
         self.check_required()
         self.check_allowed_keys()
 
-class InstanceValidator(object):
-    def __init__(self, absolute_path):
+class InstanceValidator(DiagnosticReporter):
+    def __init__(self, absolute_path, versions=None, vocab=None, sources=None, diagnostics=None, instance=None, version=None,
+                 id_index=None, file_name=None):
+        """
+        'versions', 'vocab' and 'sources' can be provided to share an already loaded versions file, VocabManager
+        and schema sources checkout between validators (e.g. in batch mode), otherwise they are downloaded.
+        An already parsed 'instance' (e.g. a record of a JSON-lines export) can be validated against an explicit
+        'version', 'absolute_path' then only labels the diagnostics and the @id is only checked against the
+        'file_name' if given.
+        Linked instances are only resolved if an IdIndex of the instance repository is given as 'id_index'.
+        """
         self.absolute_path = absolute_path
-        self._tuple_path = PurePath(absolute_path).parts
-        self.version = self._tuple_path[1]
-        self.subfolder = self._tuple_path[2] if self._tuple_path[2] != 'terminologies' else self._tuple_path[3]
-        self.file_name = Path(absolute_path).stem
-
-        self.namespaces = Versions("./versions.json").versions[self.version]['namespaces']
-        self.vocab = VocabManager("./types.json", "./properties.json")
-        self.instance = load_json(absolute_path)
+        self.diagnostics = diagnostics if diagnostics is not None else DiagnosticCollector()
+        if instance is None:
+            self._tuple_path = PurePath(absolute_path).parts
+            self.version = self._tuple_path[1]
+            self.subfolder = self._tuple_path[2] if self._tuple_path[2] != 'terminologies' else self._tuple_path[3]
+            self.file_name = Path(absolute_path).stem
+        else:
+            self.version = version
+            self.subfolder = None
+            self.file_name = file_name
+
+        versions = versions if versions is not None else Versions("./versions.json").versions
+        self.namespaces = versions[self.version]['namespaces']
+        self.vocab = vocab if vocab is not None else VocabManager("./types.json", "./properties.json")
+        self._vocab_index = self.vocab.index(self.version)
+        self.sources = sources
+        self.id_index = id_index
+        self.instance = instance if instance is not None else load_json(absolute_path)
+        # Active JSON-LD context of the node being checked, shared with the other instances using the same @context
+        self._context = Context.get(self.instance.get('@context'))
         self._type_schema_name = None
         self._id_schema_name = None
 
-    def _nested_instance(self, value, function, instance_type):
-        if isinstance(value, dict):
-            function(value, instance_type)
-
-        elif isinstance(value, list):
-            for item in value:
-                self._nested_instance(item, function, instance_type)
-
-    def check_atid_convention(self):
+    @profiled
+    def _walk(self, node_checks):
         """
-        Validates against:
-            - White space in @id and embedded @id.
-            - Differences between file name and @id.
+        Visits each node (dictionary) of the instance once, iteratively and in document order, and runs all the given
+        node checks on it. Node checks are called with the node, its type (inherited from the parent node if it has
+        no @type), its depth and its JSON pointer. The active context of the node (see _expand_property) accounts
+        for the nested @context.
+        When several node checks run in the same walk and instrumentation is enabled, the time spent in each of them
+        is recorded under the name of its check (e.g. InstanceValidator.check_property_existence).
+        """
+        profiler = get_profiler() if len(node_checks) > 1 else None
+        durations = [0] * len(node_checks) if profiler is not None else None
+        walk_start = time.perf_counter_ns()
+        root_context = self._context
+        stack = [(self.instance, self.instance.get('@type'), 0, "", root_context)]
+        while stack:
+            node, node_type, depth, pointer, context = stack.pop()
+            node_type = node.get('@type', node_type)
+            if depth and '@context' in node:
+                context = Context.get(node['@context'], context)
+            self._context = context
+            if durations is None:
+                for node_check in node_checks:
+                    node_check(node, node_type, depth, pointer)
+            else:
+                for index, node_check in enumerate(node_checks):
+                    start = time.perf_counter_ns()
+                    node_check(node, node_type, depth, pointer)
+                    durations[index] += time.perf_counter_ns() - start
+
+            children = []
+            for property, value in node.items():
+                if property.startswith('@'):
+                    continue
+                if isinstance(value, dict):
+                    children.append((value, node_type, depth + 1, pointer + json_pointer(property), context))
+                elif isinstance(value, list):
+                    property_pointer = pointer + json_pointer(property)
+                    children.extend((item, node_type, depth + 1, f"{property_pointer}/{index}", context)
+                                    for index, item in enumerate(value) if isinstance(item, dict))
+            stack.extend(reversed(children))
+        self._context = root_context
+
+        if durations is not None:
+            # One span per check, laid out one after the other from the start of the walk
+            start = walk_start
+            for node_check, duration in zip(node_checks, durations):
+                check = node_check.__name__.replace('_check_node_', 'check_', 1)
+                profiler.record(f"{type(self).__name__}.{check}", start, duration)
+                start += duration
+
+    def _expand_property(self, property):
+        """
+        Expands a property name with the active context of the node being checked.
         """
-        def _check_instance_id_convention(instance):
-            if instance is not None and '@id' in instance:
-                if ' ' in instance['@id']:
-                    logging.error(f'White space detected for @id: "{instance["@id"]}".')
-                if instance['@id'].startswith(self.namespaces.get('instances')) and instance['@id'].count('/') != 5:
-                    logging.error(f'Unexpected number of "/" for @id: "{instance["@id"]}".')
+        return self._context.expand(property)
 
+    def _check_file_name(self):
+        if self.file_name is None:
+            return
         # TODO use a dictionary of abbreviations and Upper case name
         _id_instance_name = self.instance['@id'].split('/')[-1]
         # TODO instead of using filename (abbreviations and other properties could be used)
         if _id_instance_name != self.file_name:
-            logging.error(f'Mismatch between @id entity "{_id_instance_name}" and file name "{self.file_name}".')
-        _check_instance_id_convention(self.instance)
+            self._error('check_atid_convention', f'Mismatch between @id entity "{_id_instance_name}" and file name "{self.file_name}".', '/@id')
 
-        for property in self.instance:
-            if self.instance[property] is not None and type(self.instance[property]) is dict and '@id' in self.instance[property]:
-                _check_instance_id_convention(self.instance[property])
-            if type(self.instance[property]) is list and self.instance[property]:
-                for instance_element in self.instance[property]:
-                    _check_instance_id_convention(instance_element)
+    def _check_node_atid_convention(self, node, node_type, depth, pointer):
+        # Only the instance and the nodes directly embedded in it are checked
+        if depth > 1 or '@id' not in node:
+            return
+        if ' ' in node['@id']:
+            self._error('check_atid_convention', f'White space detected for @id: "{node["@id"]}".', f'{pointer}/@id')
+        if node['@id'].startswith(self.namespaces.get('instances')) and node['@id'].count('/') != 5:
+            self._error('check_atid_convention', f'Unexpected number of "/" for @id: "{node["@id"]}".', f'{pointer}/@id')
 
+    @profiled
+    def check_atid_convention(self):
+        """
+        Validates against:
+            - White space in @id and embedded @id.
+            - Differences between file name and @id.
+        """
+        self._check_file_name()
+        self._walk([self._check_node_atid_convention])
+
+    @profiled
     def check_missmatch_id_type(self):
         """
         Validates against:
@@ -202,15 +305,11 @@ class InstanceValidator(object):
             - namespace of @type.
             - mismatch of @type and @id.
         """
-        if self._type_schema_name not in self.vocab.vocab_types or self.version not in self.vocab.vocab_types[self._type_schema_name]['isPartOfVersion']:
-            logging.error(f'@type "{self._type_schema_name}" not found for "{self.version}" version.')
-
-        for _type_namespace_version in self.vocab.vocab_types[self._type_schema_name]['hasNamespace']:
-            if self.version in _type_namespace_version['inVersions']:
-                expected_type = _type_namespace_version['namespace'] + self._type_schema_name
-                if expected_type != self.instance['@type']:
-                    logging.error(f'Unexpected namespace for @type: "{self.instance["@type"]}".')
-                break
+        if self._type_schema_name not in self._vocab_index.types:
+            self._error('check_missmatch_id_type', f'@type "{self._type_schema_name}" not found for "{self.version}" version.', '/@type')
+        elif (namespace := self._vocab_index.types[self._type_schema_name]) is not None:
+            if namespace + self._type_schema_name != self.instance['@type']:
+                self._error('check_missmatch_id_type', f'Unexpected namespace for @type: "{self.instance["@type"]}".', '/@type')
 
         if self._id_schema_name in {'licenses', 'contentTypes', 'accessibilities'}:
             # self._type_schema_name is not using plural
@@ -218,88 +317,120 @@ class InstanceValidator(object):
         else:
             expected_type_name = self._id_schema_name[0].upper() + self._id_schema_name[1:]
         if expected_type_name != self._type_schema_name:
-            logging.error(f'Mismatch between @id schema name "{self._id_schema_name}" and @type schema name "{self._type_schema_name}".')
-
-    def check_property_existence(self, instance=None, instance_type=None):
-        """
-        Validates instance properties against the vocabulary for the given version and type.
-        """
-        instance = instance if instance is not None else self.instance
-        instance_type = instance_type if instance_type is not None else instance.get('@type')
+            self._error('check_missmatch_id_type', f'Mismatch between @id schema name "{self._id_schema_name}" and @type schema name "{self._type_schema_name}".', '/@id')
 
+    def _check_node_property_existence(self, node, node_type, depth, pointer):
         # Skip validation if no type is defined
-        if not instance_type:
+        if not node_type:
             return
 
-        for property in instance:
+        for property in node:
             if property in ('@context', '@id', '@type'):
                 continue
-            elif property not in self.vocab.vocab_properties:
-                logging.error(f'Unknown property "{property}".')
-                continue
-            elif self.version not in self.vocab.vocab_properties[property]["usedIn"]:
-                logging.error(f'Property "{property}" not available in version "{self.version}".')
-                continue
-            elif instance['@type'] not in self.vocab.vocab_properties[property]["usedIn"][self.version]:
-                logging.error(f'Property "{property}" not available for type "{instance_type}" in version "{self.version}".')
-                continue
-            self._nested_instance(instance[property], self.check_property_existence, instance_type)
+            property_pointer = pointer + json_pointer(property)
+            if property not in self._vocab_index.property_versions:
+                self._error('check_property_existence', f'Unknown property "{property}".', property_pointer)
+            elif self.version not in self._vocab_index.property_versions[property]:
+                self._error('check_property_existence', f'Property "{property}" not available in version "{self.version}".', property_pointer)
+            elif property not in self._vocab_index.type_properties.get(node_type, ()):
+                self._error('check_property_existence', f'Property "{property}" not available for type "{node_type}" in version "{self.version}".', property_pointer)
+
+    @profiled
+    def check_property_existence(self):
+        """
+        Validates instance properties against the vocabulary for the given version and type.
+        """
+        self._walk([self._check_node_property_existence])
 
-    def _check_property_value_format(self, instance, property, openminds_class, required:bool=False):
+    def _check_property_value_format(self, value, property, expected_type, required:bool=False, pointer=""):
         """
         Validates value format for instance properties against the vocabulary for the given version and type.
         """
-        value = instance[property]
+        check = 'check_property_constraint'
         if value in ('', ' '):
             msg = f'Invalid value "{value}" for property "{property}".'
-            logging.error(msg) if required else logging.warning(msg)
+            self._error(check, msg, pointer) if required else self._warning(check, msg, pointer)
         elif required and value is None:
-            logging.error(f'Missing required value for "{property}".')
+            self._error(check, f'Missing required value for "{property}".', pointer)
 
         elif isinstance(value, list) and not value:
-            logging.warning(f'Empty array for "{property}".')
+            self._warning(check, f'Empty array for "{property}".', pointer)
 
-        if 'type' in openminds_class['properties'][property]:
-            if openminds_class['properties'][property]['type'] == 'array'  and type(value) not in (list, type(None)):
-                logging.error(f'Invalid value type for property "{property}": expected an array.')
-            elif openminds_class['properties'][property]['type'] == 'string'  and type(value) not in (str, type(None)):
-                logging.error(f'Invalid value type for property "{property}": expected a string.')
-        elif ('_embeddedTypes' or '_linkedTypes') in openminds_class['properties'][property] and type(value) not in (dict, type(None)):
-            logging.error(f'Invalid value type for property "{property}": expected a dictionary.')
+        if expected_type is not None and value is not None and not isinstance(value, expected_type):
+            self._error(check, f'Invalid value type for property "{property}": expected {_VALUE_TYPE_NAMES[expected_type]}.', pointer)
 
-    def check_property_constraint(self, instance=None, instance_type=None, openminds_class=None):
-        """
-        Validates the presence and values of required and optional properties in the instance.
-        """
-        instance = instance if instance is not None else self.instance
-        if '@type' in instance:
-            instance_type = instance.get('@type').split('/')[-1]
+    def _check_node_property_constraint(self, node, node_type, depth, pointer):
         # Skip validation if no @type
-        else:
+        if '@type' not in node:
             return
 
-        openminds_class = find_openminds_class(self.version, instance_type)
-        openminds_class_properties =  openminds_class["properties"].keys() if 'properties' in openminds_class else None
-        required_properties = openminds_class["required"] if 'required' in openminds_class else None
-        optional_properties = list(set(openminds_class_properties) - set(required_properties))
-
-        if "@context" in instance:
-            instance = expand_jsonld(instance)
+        rules = compile_type_rules(self.version, node['@type'].split('/')[-1], self.sources)
+        if rules is None:
+            self._error('check_property_constraint', f'Schema not found for @type "{node["@type"]}".', f'{pointer}/@type')
+            return
 
-        for required_property in required_properties:
-            if required_property not in instance:
-                logging.error(f'Missing required property "{required_property}".')
+        properties = {self._expand_property(property): property for property in node if not property.startswith('@')}
+        for required_property in rules.required:
+            if required_property not in properties:
+                self._error('check_property_constraint', f'Missing required property "{required_property}".', pointer)
             else:
-                self._check_property_value_format(instance, required_property, openminds_class, required=True)
-                self._nested_instance(instance[required_property], self.check_property_constraint, instance_type)
+                property = properties[required_property]
+                self._check_property_value_format(node[property], required_property, rules.expected_types.get(required_property),
+                                                  required=True, pointer=pointer + json_pointer(property))
 
-        for optional_property in optional_properties:
-            if optional_property not in instance:
-                logging.error(f'Missing optional property "{optional_property}".')
+        for optional_property in rules.optional:
+            if optional_property not in properties:
+                self._error('check_property_constraint', f'Missing optional property "{optional_property}".', pointer)
             else:
-                self._check_property_value_format(instance, optional_property, openminds_class)
-                self._nested_instance(instance[optional_property], self.check_property_constraint, instance_type)
+                property = properties[optional_property]
+                self._check_property_value_format(node[property], optional_property, rules.expected_types.get(optional_property),
+                                                  pointer=pointer + json_pointer(property))
+
+    @profiled
+    def check_property_constraint(self):
+        """
+        Validates the presence and values of required and optional properties in the instance.
+        """
+        self._walk([self._check_node_property_constraint])
+
+    def _check_node_linked_instances(self, node, node_type, depth, pointer):
+        # Skip validation if no @type
+        if '@type' not in node:
+            return
+
+        rules = compile_type_rules(self.version, node['@type'].split('/')[-1], self.sources)
+        if rules is None or not rules.linked_types:
+            return
+
+        for property in node:
+            linked_types = rules.linked_types.get(self._expand_property(property)) if not property.startswith('@') else None
+            if linked_types is None:
+                continue
+            values = node[property] if isinstance(node[property], list) else [node[property]]
+            for index, value in enumerate(values):
+                if not isinstance(value, dict) or '@id' not in value:
+                    continue
+                value_pointer = pointer + json_pointer(property) + (f"/{index}" if isinstance(node[property], list) else "")
+                target = self.id_index.get(self.version, value['@id'])
+                if target is None:
+                    self._error('check_linked_instances', f'Linked instance "{value["@id"]}" not found.', f'{value_pointer}/@id')
+                    continue
+                target_file, target_type = target
+                # Namespaces of the linked instances are checked on their own
+                if target_type is None or target_type.split('/')[-1] not in {linked_type.split('/')[-1] for linked_type in linked_types}:
+                    self._error('check_linked_instances', f'Linked instance "{value["@id"]}" ({target_file}) has @type "{target_type}", '
+                                f'expected one of {", ".join(sorted(linked_types))} for property "{property}".', f'{value_pointer}/@id')
+
+    @profiled
+    def check_linked_instances(self):
+        """
+        Validates that the linked instances exist in the instance repository and have one of the _linkedTypes of the
+        property, requires an 'id_index'.
+        """
+        if self.id_index is not None:
+            self._walk([self._check_node_linked_instances])
 
+    @profiled
     def check_minimal_jsonld_structure(self):
         """
         Check if @id and @type are present in the instance.
@@ -307,18 +438,24 @@ class InstanceValidator(object):
         # TODO Check @id in lists or instances when needed
         # Schemas will need to be used to ensure that the constraints are correctly applied
         if not all(key in self.instance for key in ('@id', '@type')):
-            logging.error("Instance must contain both @id and @type.")
+            self._error('check_minimal_jsonld_structure', "Instance must contain both @id and @type.")
 
         self._type_schema_name = self.instance['@type'].split('/')[-1]
         self._id_schema_name = self.instance['@id'].split('/')[-2]
 
+    @profiled
     def validate(self):
         """
         Run all the tests defined in InstanceValidator.
         """
-        clone_central()
+        if self.sources is None:
+            self.sources = clone_central(version=self.version)
         self.check_minimal_jsonld_structure()
-        self.check_atid_convention()
+        self._check_file_name()
         self.check_missmatch_id_type()
-        self.check_property_existence()
-        self.check_property_constraint()
+        # Node checks of check_atid_convention, check_property_existence, check_property_constraint and
+        # check_linked_instances in a single pass
+        node_checks = [self._check_node_atid_convention, self._check_node_property_existence, self._check_node_property_constraint]
+        if self.id_index is not None:
+            node_checks.append(self._check_node_linked_instances)
+        self._walk(node_checks)
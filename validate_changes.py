@@ -0,0 +1,115 @@
+import argparse
+import sys
+
+from collections import Counter
+from pathlib import Path
+
+from openMINDS_validation.cache import ResultCache
+from openMINDS_validation.diagnostics import DiagnosticCollector
+from openMINDS_validation.impact import DependencyState, affected_instances, affected_schemas
+from openMINDS_validation.instances import IdIndex
+from openMINDS_validation.runner import run_validation, validate_instance_file, validate_schema_file, default_jobs, \
+    instance_cache_key, schema_cache_key, load_instance_state
+from openMINDS_validation.schemas import ExtendsResolver
+from openMINDS_validation.utils import Versions, get_sources_commit, index_submodules
+
+
+def print_affected(kind, affected):
+    reasons = Counter(reason if not reason.startswith(("links to", "extends")) else reason.split(" ")[0] + " ..."
+                      for reason in affected.values())
+    print(f"{len(affected)} {kind} to validate" + (f" ({', '.join(f'{reason}: {n}' for reason, n in sorted(reasons.items()))})." if reasons else "."))
+
+
+def validate(paths, validate_file, state, args, cache_key, collector):
+    """
+    Validates the given files and returns the ones that failed.
+    """
+    failed_files = []
+    for result in run_validation(paths, validate_file, state, args.jobs,
+                                 result_cache=None if args.no_cache else ResultCache(), cache_key=cache_key):
+        result.report()
+        collector.extend(result.diagnostics)
+        if result.errors:
+            failed_files.append(result.path)
+    return failed_files
+
+
+def validate_instances(args, collector):
+    """
+    Validates the instances affected by the changes since the base commit and by the changes of the schema sources,
+    vocab and versions.json since the previous validation.
+    """
+    index = IdIndex(".").load()
+    dependencies = DependencyState(".")
+    state = load_instance_state(sorted({entry["version"] for entry in index.files.values()}))
+    if args.check_links:
+        state["id_index"] = index
+    affected = affected_instances(index, args.base, state, dependencies.load(), args.check_links)
+    print_affected("instances", affected)
+    if args.list:
+        for path, reason in affected.items():
+            print(f"{path}: {reason}")
+        return 0
+
+    failed_files = validate(list(affected), validate_instance_file, state, args, instance_cache_key, collector)
+    # The failed instances are selected again by the next run
+    dependencies.save(get_sources_commit(state["sources"]), state["vocab"].digest, state["versions"], failed_files)
+    if failed_files:
+        print(f"❌ {len(failed_files)} of {len(affected)} instances failed validation.")
+    elif affected:
+        print(f"✅ All {len(affected)} instances passed validation.")
+    return len(failed_files)
+
+
+def validate_schemas(args, collector):
+    """
+    Validates the schema templates changed since the base commit and their _extends descendants.
+    """
+    affected = affected_schemas(ExtendsResolver("./schemas"), args.base)
+    print_affected("schemas", affected)
+    if args.list:
+        for path, reason in affected.items():
+            print(f"{path}: {reason}")
+        return 0
+
+    versions = Versions("./versions.json").versions
+    state = {"versions": versions, "repository": args.repository, "branch": args.branch,
+             "submodules": index_submodules(versions)}
+    failed_files = validate(list(affected), validate_schema_file, state, args, schema_cache_key, collector)
+    if failed_files:
+        print(f"❌ {len(failed_files)} of {len(affected)} schemas failed validation.")
+    elif affected:
+        print(f"✅ All {len(affected)} schemas passed validation.")
+    return len(failed_files)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validates the instances and schema templates affected by the changes "
+                                                 "since a base commit, and the instances affected by the changes of the "
+                                                 "schemas, vocab and versions.json since the previous validation.")
+    parser.add_argument("--base", default="HEAD^", help="The commit to compare with (default: HEAD^).")
+    parser.add_argument("--repository", help="The repository of the submodule, to validate its schema templates.")
+    parser.add_argument("--branch", help="The branch of the submodule, to validate its schema templates.")
+    parser.add_argument("--check-links", action="store_true",
+                        help="Checks that linked instances exist in the repository and have the expected @type.")
+    parser.add_argument("--list", action="store_true", help="Only lists the affected files and why they are affected.")
+    parser.add_argument("--report", help="Writes the diagnostics to the given file.")
+    parser.add_argument("--report-format", choices=["jsonl", "sarif"], default="jsonl", help="Format of the report.")
+    parser.add_argument("--no-cache", action="store_true", help="Validates all the files, ignoring the cached results.")
+    parser.add_argument("-j", "--jobs", type=int, default=default_jobs(),
+                        help="Number of worker processes (default: number of available CPUs).")
+    args = parser.parse_args()
+    if bool(args.repository) != bool(args.branch):
+        parser.error("--repository and --branch are required together")
+
+    collector = DiagnosticCollector()
+    if not Path("instances").is_dir() and not (Path("schemas").is_dir() and args.repository):
+        print("Nothing to validate: no 'instances' directory, nor 'schemas' directory with --repository and --branch.")
+    if Path("instances").is_dir():
+        validate_instances(args, collector)
+    if Path("schemas").is_dir() and args.repository:
+        validate_schemas(args, collector)
+
+    if args.report:
+        collector.write(args.report, args.report_format)
+    sys.exit(collector.exit_status())
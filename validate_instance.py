@@ -1,12 +1,164 @@
-import logging
+import argparse
+import json
 import sys
+from pathlib import PurePath
 
-from openMINDS_validation.validation import InstanceValidator
+from openMINDS_validation import profiling
+from openMINDS_validation.cache import ResultCache
+from openMINDS_validation.diagnostics import DiagnosticCollector
+from openMINDS_validation.matrix import CompatibilityMatrix, select_versions, validate_instance_matrix_file, \
+    instance_matrix_cache_key
+from openMINDS_validation.runner import run_validation, validate_instance_file, validate_instance_stream, collect_paths, \
+    default_jobs, instance_cache_key, load_instance_state
+from openMINDS_validation.utils import Versions
+
+
+def validate_files(args):
+    instance_paths = collect_paths(args.sources, "*.jsonld")
+    if not instance_paths:
+        print("No instance to validate.")
+        return 0
+
+    state = load_instance_state({PurePath(path).parts[1] for path in instance_paths if len(PurePath(path).parts) > 1}, args.check_links)
+
+    collector = DiagnosticCollector()
+    failed_files = []
+    for result in run_validation(instance_paths, validate_instance_file, state, args.jobs,
+                                 result_cache=None if args.no_cache else ResultCache(), cache_key=instance_cache_key):
+        result.report()
+        collector.extend(result.diagnostics)
+        if result.errors:
+            failed_files.append(result.path)
+
+    if args.report:
+        collector.write(args.report, args.report_format)
+
+    if failed_files:
+        print(f"❌ {len(failed_files)} of {len(instance_paths)} instances failed validation.")
+    else:
+        print(f"✅ All {len(instance_paths)} instances passed validation.")
+    return collector.exit_status()
+
+
+def validate_matrix(args):
+    """
+    Validates each instance against all the selected versions, parsing it once, and prints a version × file table.
+    """
+    instance_paths = collect_paths(args.sources, "*.jsonld")
+    if not instance_paths:
+        print("No instance to validate.")
+        return 0
+
+    try:
+        versions = select_versions(Versions("./versions.json").versions, args.matrix_versions)
+    except ValueError as e:
+        print(e)
+        return 2
+    state = load_instance_state(versions)
+    state["matrix_versions"] = versions
+
+    collector = DiagnosticCollector()
+    matrix = CompatibilityMatrix(versions)
+    for result in run_validation(instance_paths, validate_instance_matrix_file, state, args.jobs,
+                                 result_cache=None if args.no_cache else ResultCache(), cache_key=instance_matrix_cache_key):
+        collector.extend(result.diagnostics)
+        matrix.add(result)
+
+    print(matrix.table())
+    if args.report:
+        collector.write(args.report, args.report_format)
+    if args.matrix_report:
+        matrix.write(args.matrix_report)
+
+    # The matrix documents the compatibility with the other versions, only errors against the version of the files
+    # (instances/<version>/...) fail the run
+    failed_files = []
+    for path, cells in matrix.files.items():
+        parts = PurePath(path).parts
+        if len(parts) > 2 and parts[1] in cells and cells[parts[1]]["errors"]:
+            failed_files.append(path)
+    if failed_files:
+        print(f"❌ {len(failed_files)} of {len(instance_paths)} instances failed validation against their own version.")
+        return 1
+    print(f"✅ {len(instance_paths)} instances validated against {len(versions)} versions.")
+    return 0
+
+
+def validate_ndjson(args):
+    """
+    Validates a JSON-lines stream record by record. Only records with diagnostics are reported, and the report
+    is written as the records are validated, so that memory use does not grow with the number of records.
+    """
+    state = load_instance_state([args.version], args.check_links)
+    stream = sys.stdin if args.ndjson == '-' else open(args.ndjson)
+    report = open(args.report, "w") if args.report else None
+    records = failed_records = 0
+    try:
+        for result in validate_instance_stream(stream, args.version, state, label="<stdin>" if args.ndjson == '-' else args.ndjson):
+            records += 1
+            if result.diagnostics:
+                result.report()
+            if result.errors:
+                failed_records += 1
+            if report:
+                for diagnostic in result.diagnostics:
+                    report.write(json.dumps(diagnostic._asdict()) + "\n")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if report:
+            report.close()
+
+    if failed_records:
+        print(f"❌ {failed_records} of {records} instances failed validation.")
+        return 1
+    print(f"✅ All {records} instances passed validation.")
+    return 0
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        logging.error("Usage: python validate_instance.py <src_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Validates openMINDS instances.")
+    parser.add_argument("sources", nargs="*",
+                        help="Instance files, directories containing instances, or '-' to read paths from stdin.")
+    parser.add_argument("--ndjson", metavar="FILE",
+                        help="Validates the instances of a JSON-lines file ('-' for stdin) instead, requires --version.")
+    parser.add_argument("--version", help="The openMINDS version of the instances of --ndjson.")
+    parser.add_argument("--matrix", action="store_true",
+                        help="Validates each instance against all the versions of versions.json (or --matrix-versions) "
+                             "and prints a version × file compatibility table.")
+    parser.add_argument("--matrix-versions", metavar="VERSIONS", help="Comma-separated versions to validate against with --matrix.")
+    parser.add_argument("--matrix-report", metavar="FILE", help="Writes the compatibility table of --matrix to the given JSON file.")
+    parser.add_argument("--report", help="Writes the diagnostics to the given file.")
+    parser.add_argument("--report-format", choices=["jsonl", "sarif"], default="jsonl", help="Format of the report.")
+    parser.add_argument("--check-links", action="store_true",
+                        help="Checks that linked instances exist in the repository and have the expected @type.")
+    parser.add_argument("--no-cache", action="store_true", help="Validates all the files, ignoring the cached results.")
+    parser.add_argument("-j", "--jobs", type=int, default=default_jobs(),
+                        help="Number of worker processes (default: number of available CPUs).")
+    parser.add_argument("--profile", metavar="FILE", help="Records timings, I/O and cache counters to the given file.")
+    parser.add_argument("--profile-format", choices=["json", "chrome"], default="json",
+                        help="Format of the profile: JSON summary or Chrome trace (default: json).")
+    parser.add_argument("--profile-memory", action="store_true", help="Records the memory peak of each file in the profile.")
+    args = parser.parse_args()
+
+    if args.ndjson:
+        if args.sources or not args.version:
+            parser.error("--ndjson requires --version and no other source")
+        if args.report and args.report_format != "jsonl":
+            parser.error("only jsonl reports can be written with --ndjson")
+    elif not args.sources:
+        parser.error("the following arguments are required: sources")
+    if args.matrix and (args.ndjson or args.check_links):
+        parser.error("--matrix can't be combined with --ndjson or --check-links")
+    if not args.matrix and (args.matrix_versions or args.matrix_report):
+        parser.error("--matrix-versions and --matrix-report require --matrix")
 
-    InstanceValidator(sys.argv[1]).validate()
+    if args.profile:
+        profiling.enable(memory=args.profile_memory)
+    if args.ndjson:
+        status = validate_ndjson(args)
+    else:
+        status = validate_matrix(args) if args.matrix else validate_files(args)
+    if args.profile:
+        profiling.get_profiler().write(args.profile, args.profile_format)
+    sys.exit(status)
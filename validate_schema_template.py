@@ -1,12 +1,125 @@
+import argparse
+import json
 import logging
 import sys
 
-from openMINDS_validation.validation import SchemaTemplateValidator
+from openMINDS_validation import profiling
+from openMINDS_validation.cache import ResultCache
+from openMINDS_validation.diagnostics import DiagnosticCollector
+from openMINDS_validation.matrix import CompatibilityMatrix, select_versions, validate_schema_matrix_file, \
+    schema_matrix_cache_key
+from openMINDS_validation.runner import run_validation, validate_schema_file, collect_paths, default_jobs, \
+    schema_cache_key
+from openMINDS_validation.utils import Versions, index_submodules, prefetch_remote_extends
+
+
+def prefetch_extends(schema_paths, state):
+    """
+    Downloads the remote _extends of the given schemas concurrently, before they are validated.
+    """
+    extends_values = set()
+    for schema_path in schema_paths:
+        try:
+            with open(schema_path) as f:
+                extends_value = json.load(f).get('_extends', '')
+        except (OSError, ValueError, AttributeError):
+            # Reported by the validation
+            continue
+        if extends_value.startswith('/'):
+            extends_values.add(extends_value)
+    if not extends_values:
+        return
+    build_version, _ = state["submodules"].get((state["repository"], state["branch"]), ('latest', None))
+    # Matrix validations resolve the remote _extends in each version
+    for version in state.get("matrix_versions") or [build_version]:
+        try:
+            prefetch_remote_extends(extends_values, state["versions"], version)
+        except Exception as e:
+            logging.warning(f"Unable to prefetch the remote _extends: {e!r}")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        logging.error("Usage: python validate_instance.py <src_file> <src_repository> <src_branch>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Validates openMINDS schema templates.")
+    parser.add_argument("sources", nargs="*",
+                        help="Schema files, directories containing schemas, or '-' to read paths from stdin.")
+    parser.add_argument("--all", action="store_true",
+                        help="Validates all the schema templates of the submodule (./schemas) in one run.")
+    parser.add_argument("--repository", required=True, help="The repository of the submodule the schemas belong to.")
+    parser.add_argument("--branch", required=True, help="The branch of the submodule the schemas belong to.")
+    parser.add_argument("--matrix", action="store_true",
+                        help="Validates each schema against all the versions of versions.json (or --matrix-versions), "
+                             "resolving the remote _extends in each version, and prints a version × file compatibility table.")
+    parser.add_argument("--matrix-versions", metavar="VERSIONS", help="Comma-separated versions to validate against with --matrix.")
+    parser.add_argument("--matrix-report", metavar="FILE", help="Writes the compatibility table of --matrix to the given JSON file.")
+    parser.add_argument("--report", help="Writes the diagnostics to the given file.")
+    parser.add_argument("--report-format", choices=["jsonl", "sarif"], default="jsonl", help="Format of the report.")
+    parser.add_argument("--no-cache", action="store_true", help="Validates all the files, ignoring the cached results.")
+    parser.add_argument("-j", "--jobs", type=int, default=default_jobs(),
+                        help="Number of worker processes (default: number of available CPUs).")
+    parser.add_argument("--profile", metavar="FILE", help="Records timings, I/O and cache counters to the given file.")
+    parser.add_argument("--profile-format", choices=["json", "chrome"], default="json",
+                        help="Format of the profile: JSON summary or Chrome trace (default: json).")
+    parser.add_argument("--profile-memory", action="store_true", help="Records the memory peak of each file in the profile.")
+    args = parser.parse_args()
+    if not args.sources and not args.all:
+        parser.error("the following arguments are required: sources (or --all)")
+    if not args.matrix and (args.matrix_versions or args.matrix_report):
+        parser.error("--matrix-versions and --matrix-report require --matrix")
+    if args.profile:
+        profiling.enable(memory=args.profile_memory)
+
+    schema_paths = collect_paths(args.sources + (["./schemas"] if args.all else []), "*.schema.tpl.json")
+    if not schema_paths:
+        print("No schema to validate.")
+        sys.exit(0)
+
+    versions = Versions("./versions.json").versions
+    state = {
+        "versions": versions,
+        "repository": args.repository,
+        "branch": args.branch,
+        "submodules": index_submodules(versions),
+    }
+    if args.matrix:
+        try:
+            state["matrix_versions"] = select_versions(versions, args.matrix_versions)
+        except ValueError as e:
+            parser.error(str(e))
+    prefetch_extends(schema_paths, state)
+
+    collector = DiagnosticCollector()
+    matrix = CompatibilityMatrix(state["matrix_versions"]) if args.matrix else None
+    failed_files = []
+    for result in run_validation(schema_paths, validate_schema_matrix_file if matrix else validate_schema_file, state, args.jobs,
+                                 result_cache=None if args.no_cache else ResultCache(),
+                                 cache_key=schema_matrix_cache_key if matrix else schema_cache_key):
+        collector.extend(result.diagnostics)
+        if matrix:
+            matrix.add(result)
+            continue
+        result.report()
+        if result.errors:
+            failed_files.append(result.path)
+
+    if args.report:
+        collector.write(args.report, args.report_format)
 
-    SchemaTemplateValidator(sys.argv[1], sys.argv[2], sys.argv[3]).validate()
+    if matrix:
+        print(matrix.table())
+        if args.matrix_report:
+            matrix.write(args.matrix_report)
+        # Only the errors against the build version of the submodule fail the run
+        build_version, _ = state["submodules"].get((args.repository, args.branch), ('latest', None))
+        if build_version in state["matrix_versions"]:
+            failed_files = [path for path, cells in matrix.files.items() if cells[build_version]["errors"]]
+        if failed_files:
+            print(f"❌ {len(failed_files)} of {len(schema_paths)} schemas failed validation against {build_version}.")
+        else:
+            print(f"✅ {len(schema_paths)} schemas validated against {len(state['matrix_versions'])} versions.")
+    elif failed_files:
+        print(f"❌ {len(failed_files)} of {len(schema_paths)} schemas failed validation.")
+    else:
+        print(f"✅ All {len(schema_paths)} schemas passed validation.")
+    if args.profile:
+        profiling.get_profiler().write(args.profile, args.profile_format)
+    sys.exit(int(bool(failed_files)) if matrix else collector.exit_status())
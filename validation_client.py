@@ -0,0 +1,66 @@
+import argparse
+import json
+import sys
+
+# Only imports the standard library, not the validation code
+from openMINDS_validation.client import ValidationClient, DEFAULT_ADDRESS
+
+
+def report(result):
+    """
+    Prints a result of the server like the validation scripts do, returns True if it has no error.
+    """
+    for message in result["messages"]:
+        print(message)
+    if result["errors"]:
+        print(f"❌ Validation failed for {result['path']}")
+    elif result["warnings"]:
+        print(f"⚠️ Validation passed with warnings for {result['path']}")
+    else:
+        print(f"✅ Validation passed for {result['path']}")
+    return not result["errors"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validates openMINDS files with a running validation_server.py.")
+    parser.add_argument("paths", nargs="*", help="Instance or schema template files.")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS,
+                        help=f"Address of the server, 'HOST:PORT' or a Unix socket path (default: {DEFAULT_ADDRESS}).")
+    parser.add_argument("--stdin", action="store_true",
+                        help="Validates the instance document read from stdin (e.g. an unsaved buffer), requires --version.")
+    parser.add_argument("--version", help="The openMINDS version of the instance read from stdin.")
+    parser.add_argument("--label", default="<stdin>", help="Label of the instance read from stdin in the messages.")
+    parser.add_argument("--repository", help="The repository of the submodule of the schema templates.")
+    parser.add_argument("--branch", help="The branch of the submodule of the schema templates.")
+    parser.add_argument("--json", action="store_true", help="Prints the results of the server as JSON lines.")
+    parser.add_argument("--status", action="store_true", help="Prints the status of the server.")
+    parser.add_argument("--reload", action="store_true", help="Makes the server reload the versions, vocab and sources.")
+    parser.add_argument("--shutdown", action="store_true", help="Stops the server.")
+    args = parser.parse_args()
+
+    client = ValidationClient(args.address)
+    try:
+        if args.status or args.reload or args.shutdown:
+            command = client.status if args.status else client.reload if args.reload else client.shutdown
+            print(json.dumps(command(), indent=2))
+            sys.exit(0)
+        if args.stdin:
+            if not args.version:
+                parser.error("--stdin requires --version")
+            results = [client.validate_instance(json.load(sys.stdin), args.version, args.label)]
+        elif args.paths:
+            results = [client.validate_path(path, args.repository, args.branch) for path in args.paths]
+        else:
+            parser.error("the following arguments are required: paths (or --stdin)")
+    except (ConnectionError, OSError) as e:
+        print(f"Validation server error ({args.address}): {e}", file=sys.stderr)
+        sys.exit(2)
+
+    passed = True
+    for result in results:
+        if args.json:
+            print(json.dumps(result))
+            passed &= not result["errors"]
+        else:
+            passed &= report(result)
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,25 @@
+import argparse
+import logging
+import os
+
+from openMINDS_validation.client import DEFAULT_ADDRESS
+from openMINDS_validation.server import ValidationServer, serve
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves openMINDS validations with the versions file, vocab and "
+                                                 "schema sources kept loaded (see validation_client.py).")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS,
+                        help=f"'HOST:PORT' or the path of a Unix socket (default: {DEFAULT_ADDRESS}).")
+    parser.add_argument("--check-links", action="store_true",
+                        help="Checks that linked instances exist in the repository and have the expected @type.")
+    args = parser.parse_args()
+
+    # Diagnostics are returned to the clients, only the errors are printed. The root logger stays at WARNING for the
+    # warnings to be captured in the results.
+    logging.getLogger().handlers.clear()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
+    logging.getLogger().handlers[0].setLevel(logging.ERROR)
+    validation_server = ValidationServer(os.getcwd(), args.check_links)
+    print(f"Validation server listening on {args.address}.", flush=True)
+    serve(validation_server, args.address)